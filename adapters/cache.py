@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry.
+
+    Entries expire `ttl` seconds after being set. When `maxsize` is reached,
+    expired entries are purged first, then the oldest insertions are dropped.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 10.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                self._purge(now)
+                while len(self._data) >= self.maxsize:
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (now + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for `key` is in flight, other
+    callers with the same key wait for and share its result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
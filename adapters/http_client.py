@@ -0,0 +1,47 @@
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+# Either an httpx.Client or a requests.Session; adapters only use post/get and
+# response.status_code / raise_for_status() / content, which both expose.
+HttpSession = Any
+
+# Sized for the snapshot fan-out: several concurrent requests per snapshot, many snapshots at once.
+MAX_CONNECTIONS = 128
+MAX_KEEPALIVE_CONNECTIONS = 64
+
+
+def build_session() -> HttpSession:
+    """
+    Build the shared HTTP client for RPC + REST calls.
+
+    Prefers an HTTP/2 httpx.Client so concurrent requests multiplex over one
+    kept-alive TLS connection per host. Falls back to requests.Session when
+    httpx (or its h2 extra) is not installed; its per-host pool is enlarged so
+    concurrent fetches reuse connections instead of opening throwaway ones.
+    """
+    if httpx is not None:
+        try:
+            return httpx.Client(
+                http2=True,
+                timeout=15,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        except ImportError:
+            # httpx raises ImportError when http2=True but h2 is missing.
+            pass
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=MAX_KEEPALIVE_CONNECTIONS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,7 +1,6 @@
-from typing import Any, Dict, Protocol, runtime_checkable
+from typing import Any, Dict, Protocol
 
 
-@runtime_checkable
 class LPAdapter(Protocol):
     """
     Abstract LP adapter for AMM/CLMM protocols.
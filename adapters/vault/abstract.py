@@ -1,7 +1,6 @@
-from typing import Any, Dict, Protocol, runtime_checkable
+from typing import Any, Dict, Protocol
 
 
-@runtime_checkable
 class VaultAdapter(Protocol):
     """
     Adapter interface for vault / structured product protocols.
@@ -1,6 +1,10 @@
-from typing import Any, Dict, List, Optional
+import base64
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import requests
+import orjson
+
+from adapters.cache import SingleFlight, TTLCache
+from adapters.http_client import HttpSession, build_session
 
 # Avoid direct import cycle on type checking
 try:
@@ -11,6 +15,29 @@ except Exception:
     TYPE_CHECKING = False
 
 
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+# SPL Token account layout (165 bytes): mint [0:32], owner [32:64], amount u64 LE [64:72], ...
+TOKEN_ACCOUNT_SIZE = 165
+
+USDC_MICRO = 1_000_000
+
+# getMultipleAccounts accepts at most 100 addresses per call.
+MAX_MULTIPLE_ACCOUNTS = 100
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _b58encode(raw: bytes) -> str:
+    num = int.from_bytes(raw, "big")
+    encoded = ""
+    while num:
+        num, rem = divmod(num, 58)
+        encoded = _B58_ALPHABET[rem] + encoded
+    leading_zeros = len(raw) - len(raw.lstrip(b"\0"))
+    return "1" * leading_zeros + encoded
+
+
 class VoltrAdapter:
     """
     Voltr-specific adapter that encapsulates RPC + Voltr REST behaviors.
@@ -18,15 +45,41 @@ class VoltrAdapter:
 
     name = "voltr"
 
-    def __init__(self, session: Optional[requests.Session] = None) -> None:
-        self.session = session or requests.Session()
+    def __init__(self, session: Optional[HttpSession] = None) -> None:
+        self.session = session or build_session()
+        # LP supply drifts slowly; the vault token authority is effectively immutable.
+        self._supply_cache = TTLCache(maxsize=1024, ttl=10)
+        self._authority_cache = TTLCache(maxsize=1024, ttl=3600)
+        # Mint decimals never change; long TTL only bounds memory.
+        self._decimals_cache = TTLCache(maxsize=4096, ttl=86400)
+        # Dashboards polling the same vault issue identical RPCs; coalesce in-flight
+        # duplicates and reuse results for a couple of seconds.
+        self._rpc_cache = TTLCache(maxsize=1024, ttl=2)
+        self._rpc_inflight = SingleFlight()
 
     # --- RPC helpers ---
     def _rpc(self, cfg: "VaultConfig", method: str, params: List[Any]) -> Dict[str, Any]:
+        """
+        Call an RPC method. Identical concurrent calls share one upstream request and
+        results are reused for a short TTL, so the returned dict must be treated as read-only.
+        """
+        key = (cfg.rpc_url, method, orjson.dumps(params, option=orjson.OPT_SORT_KEYS))
+        cached = self._rpc_cache.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch() -> Dict[str, Any]:
+            data = self._rpc_uncached(cfg, method, params)
+            self._rpc_cache.set(key, data)
+            return data
+
+        return self._rpc_inflight.do(key, fetch)
+
+    def _rpc_uncached(self, cfg: "VaultConfig", method: str, params: List[Any]) -> Dict[str, Any]:
         payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
         resp = self.session.post(cfg.rpc_url, json=payload, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         if "error" in data:
             raise RuntimeError(f"RPC error: {data['error']}")
         return data
@@ -35,53 +88,149 @@ class VoltrAdapter:
         resp = self._rpc(cfg, "getAccountInfo", [address, {"encoding": encoding}])
         return resp.get("result", {}).get("value")
 
-    def _get_token_balance(self, cfg: "VaultConfig", token_account: str) -> float:
-        resp = self._rpc(cfg, "getTokenAccountBalance", [token_account])
-        value = resp.get("result", {}).get("value")
-        if not value:
-            return 0.0
-        return float(value.get("uiAmount", 0.0))
+    def _get_multiple_accounts(
+        self, cfg: "VaultConfig", addresses: List[str], encoding: str = "jsonParsed"
+    ) -> List[Optional[Dict[str, Any]]]:
+        resp = self._rpc(cfg, "getMultipleAccounts", [addresses, {"encoding": encoding}])
+        return resp.get("result", {}).get("value") or [None] * len(addresses)
+
+    @staticmethod
+    def _parsed_info(account: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not account:
+            return {}
+        data = account.get("data")
+        if not isinstance(data, dict):
+            return {}
+        return data.get("parsed", {}).get("info", {})
 
-    def _get_token_supply(self, cfg: "VaultConfig", mint: str) -> float:
-        resp = self._rpc(cfg, "getTokenSupply", [mint])
-        value = resp.get("result", {}).get("value")
-        if not value:
+    @classmethod
+    def _parsed_token_amount(cls, account: Optional[Dict[str, Any]]) -> float:
+        token_amount = cls._parsed_info(account).get("tokenAmount", {})
+        return float(token_amount.get("uiAmount") or 0.0)
+
+    @classmethod
+    def _parsed_token_amount_micro(cls, account: Optional[Dict[str, Any]]) -> Optional[int]:
+        # Raw integer amount; micro-USDC only when the token has USDC's 6 decimals.
+        token_amount = cls._parsed_info(account).get("tokenAmount", {})
+        if token_amount.get("amount") is None or token_amount.get("decimals") != 6:
+            return None
+        return int(token_amount["amount"])
+
+    @classmethod
+    def _parsed_mint_supply(cls, account: Optional[Dict[str, Any]]) -> float:
+        info = cls._parsed_info(account)
+        supply = info.get("supply")
+        if supply is None:
             return 0.0
-        return float(value.get("uiAmount", 0.0))
+        return int(supply) / 10 ** int(info.get("decimals", 0))
 
     def _get_token_accounts_by_owner(self, cfg: "VaultConfig", owner: str) -> List[Dict[str, Any]]:
+        # base64 is much cheaper than jsonParsed server-side for owners with many accounts;
+        # the fixed SPL layout is decoded locally in _decode_token_accounts.
         resp = self._rpc(
             cfg,
             "getTokenAccountsByOwner",
             [
                 owner,
-                {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
-                {"encoding": "jsonParsed"},
+                {"programId": TOKEN_PROGRAM_ID},
+                {"encoding": "base64"},
             ],
         )
         return resp.get("result", {}).get("value", [])
 
-    # --- Voltr specifics ---
-    def _get_vault_idle_usdc(self, cfg: "VaultConfig") -> float:
-        return self._get_token_balance(cfg, cfg.idle_usdc_ata)
+    def _get_mint_decimals(self, cfg: "VaultConfig", mints: Iterable[str]) -> Dict[str, int]:
+        decimals: Dict[str, int] = {}
+        missing: List[str] = []
+        for mint in dict.fromkeys(mints):
+            cached = self._decimals_cache.get((cfg.rpc_url, mint))
+            if cached is None:
+                missing.append(mint)
+            else:
+                decimals[mint] = cached
 
-    def _get_user_lp_amount(self, cfg: "VaultConfig", user_cfg: "UserConfig") -> float:
-        return self._get_token_balance(cfg, user_cfg.lp_token_account)
+        for start in range(0, len(missing), MAX_MULTIPLE_ACCOUNTS):
+            chunk = missing[start : start + MAX_MULTIPLE_ACCOUNTS]
+            for mint, account in zip(chunk, self._get_multiple_accounts(cfg, chunk)):
+                value = self._parsed_info(account).get("decimals")
+                if value is None:
+                    continue
+                decimals[mint] = int(value)
+                self._decimals_cache.set((cfg.rpc_url, mint), int(value))
+        return decimals
 
+    def _decode_token_accounts(
+        self, cfg: "VaultConfig", accounts: List[Dict[str, Any]]
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[float], Optional[int]]]:
+        """
+        Decode base64 SPL token accounts into (pubkey, mint, ui_amount, decimals) tuples.
+        """
+        raw_rows: List[Tuple[Optional[str], Optional[str], Optional[int]]] = []
+        for acc in accounts:
+            data = acc.get("account", {}).get("data")
+            buf = base64.b64decode(data[0]) if isinstance(data, list) and data else b""
+            if len(buf) < TOKEN_ACCOUNT_SIZE:
+                raw_rows.append((acc.get("pubkey"), None, None))
+                continue
+            mint = _b58encode(buf[0:32])
+            amount = int.from_bytes(buf[64:72], "little")
+            raw_rows.append((acc.get("pubkey"), mint, amount))
+
+        mints = [mint for _, mint, _ in raw_rows]
+        decimals_by_mint = self._get_mint_decimals(cfg, (mint for mint in mints if mint))
+
+        return [
+            (pubkey, mint, amount / 10**decimals if amount is not None and decimals is not None else None, decimals)
+            for (pubkey, mint, amount), decimals in zip(raw_rows, map(decimals_by_mint.get, mints))
+        ]
+
+    # --- Voltr specifics ---
     def onchain_snapshot(self, cfg: "VaultConfig", user_cfg: "UserConfig") -> Dict[str, Any]:
-        vault_nav_idle = self._get_vault_idle_usdc(cfg)
-        lp_supply = self._get_token_supply(cfg, cfg.lp_mint)
-        user_lp = self._get_user_lp_amount(cfg, user_cfg)
+        # One getMultipleAccounts round trip; balances and supply are decoded locally.
+        # The LP mint is skipped while its supply is still cached.
+        supply_key = (cfg.rpc_url, cfg.lp_mint)
+        lp_supply = self._supply_cache.get(supply_key)
+        addresses = [cfg.idle_usdc_ata, user_cfg.lp_token_account]
+        if lp_supply is None:
+            addresses.append(cfg.lp_mint)
+        try:
+            accounts = self._get_multiple_accounts(cfg, addresses)
+        except Exception:
+            self._supply_cache.pop(supply_key)
+            raise
+        # A missing account would otherwise decode as a zero balance and look like a valid snapshot.
+        missing = [
+            name
+            for name, account in zip(("idle USDC ATA", "user LP token account", "LP mint"), accounts)
+            if account is None
+        ]
+        if missing:
+            raise RuntimeError(f"Account not found: {', '.join(missing)}")
+
+        vault_nav_idle = self._parsed_token_amount(accounts[0])
+        vault_nav_idle_micro = self._parsed_token_amount_micro(accounts[0])
+        # The idle ATA's parsed data already names the vault token authority; keep it so
+        # list_token_accounts can skip its own getAccountInfo round trip.
+        authority = self._parsed_info(accounts[0]).get("owner")
+        if authority:
+            self._authority_cache.set((cfg.rpc_url, cfg.idle_usdc_ata), authority)
+        user_lp = self._parsed_token_amount(accounts[1])
+        if lp_supply is None:
+            lp_supply = self._parsed_mint_supply(accounts[2])
+            if lp_supply <= 0:
+                raise RuntimeError(f"LP mint {cfg.lp_mint} reports no supply")
+            self._supply_cache.set(supply_key, lp_supply)
 
-        lp_price_idle = (vault_nav_idle / lp_supply) if lp_supply > 0 else 0.0
-        share_idle = (user_lp / lp_supply) if lp_supply > 0 else 0.0
+        lp_price_idle = vault_nav_idle / lp_supply
+        share_idle = user_lp / lp_supply
         withdrawable_idle = user_lp * lp_price_idle
-        idle_ratio = (vault_nav_idle / vault_nav_idle) if vault_nav_idle else 0.0
+        # NAV here is idle-only, so idle / NAV is 1 whenever the vault holds any idle USDC.
+        idle_ratio = 1.0 if vault_nav_idle else 0.0
 
         return {
             "ok": True,
             "data": {
                 "vault_nav_idle": vault_nav_idle,
+                "vault_nav_idle_micro": vault_nav_idle_micro,
                 "lp_supply": lp_supply,
                 "user_lp": user_lp,
                 "lp_price_idle": lp_price_idle,
@@ -92,56 +241,76 @@ class VoltrAdapter:
             "error": None,
         }
 
-    def _get_voltr_user_balance_raw(self, cfg: "VaultConfig", user_cfg: "UserConfig") -> Dict[str, Any]:
-        url = f"{cfg.voltr_api_base}/vault/{cfg.vault_pubkey}/user/{user_cfg.wallet}/balance"
+    def _get_voltr_user_balance_raw(self, cfg: "VaultConfig", wallet: str) -> Dict[str, Any]:
+        url = f"{cfg.voltr_api_base}/vault/{cfg.vault_pubkey}/user/{wallet}/balance"
         resp = self.session.get(url, timeout=10)
         resp.raise_for_status()
-        return resp.json()
+        return orjson.loads(resp.content)
 
-    def offchain_snapshot(self, cfg: "VaultConfig", user_cfg: "UserConfig") -> Dict[str, Any]:
-        raw = self._get_voltr_user_balance_raw(cfg, user_cfg)
+    def _get_voltr_user_balance(self, cfg: "VaultConfig", wallet: str) -> Dict[str, Any]:
+        raw = self._get_voltr_user_balance_raw(cfg, wallet)
         if not raw.get("success"):
             raise RuntimeError(f"Voltr API returned error: {raw}")
 
-        user_asset_amount = raw["data"]["userAssetAmount"]
-        withdrawable_usdc = user_asset_amount / 1_000_000
+        # Integer micro-USDC (6 decimals), exact for any position size; the float is for display.
+        withdrawable_usdc_micro = int(raw["data"]["userAssetAmount"])
 
+        return {
+            "withdrawable_usdc": withdrawable_usdc_micro / USDC_MICRO,
+            "withdrawable_usdc_micro": withdrawable_usdc_micro,
+            "raw": raw,
+        }
+
+    def offchain_snapshot(self, cfg: "VaultConfig", user_cfg: "UserConfig") -> Dict[str, Any]:
         return {
             "ok": True,
-            "data": {
-                "withdrawable_usdc": withdrawable_usdc,
-                "raw": raw,
-            },
+            "data": self._get_voltr_user_balance(cfg, user_cfg.wallet),
             "error": None,
         }
 
     def _get_vault_token_authority(self, cfg: "VaultConfig") -> str:
-        info = self._get_account_info(cfg, cfg.idle_usdc_ata, encoding="jsonParsed")
+        key = (cfg.rpc_url, cfg.idle_usdc_ata)
+        cached = self._authority_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            info = self._get_account_info(cfg, cfg.idle_usdc_ata, encoding="jsonParsed")
+        except Exception:
+            self._authority_cache.pop(key)
+            raise
         if not info:
             raise RuntimeError("Idle USDC ATA not found.")
         parsed = info["data"]["parsed"]
         owner = parsed["info"]["owner"]
+        self._authority_cache.set(key, owner)
         return owner
 
     def list_token_accounts(self, cfg: "VaultConfig") -> List[Dict[str, Any]]:
         authority = self._get_vault_token_authority(cfg)
         accounts = self._get_token_accounts_by_owner(cfg, authority)
 
-        normalized: List[Dict[str, Any]] = []
-        for acc in accounts:
-            pubkey = acc.get("pubkey")
-            data = acc.get("account", {}).get("data", {})
-            parsed = data.get("parsed", {})
-            info = parsed.get("info", {})
-            token_amount = info.get("tokenAmount", {})
-
-            normalized.append(
-                {
-                    "pubkey": pubkey,
-                    "mint": info.get("mint"),
-                    "amount": token_amount.get("uiAmount"),
-                    "decimals": token_amount.get("decimals"),
-                }
-            )
-
-        return normalized
+        return [
+            {"pubkey": pubkey, "mint": mint, "amount": amount, "decimals": decimals}
+            for pubkey, mint, amount, decimals in self._decode_token_accounts(cfg, accounts)
+        ]
+
+    def list_token_accounts_columnar(self, cfg: "VaultConfig") -> Dict[str, List[Any]]:
+        """
+        Same data as list_token_accounts, as parallel columns:
+          {"pubkey": [...], "mint": [...], "amount": [...], "decimals": [...]}
+        Cheaper to aggregate (e.g. sum amounts, filter by mint) than a list of dicts.
+        """
+        authority = self._get_vault_token_authority(cfg)
+        accounts = self._get_token_accounts_by_owner(cfg, authority)
+
+        columns: Dict[str, List[Any]] = {"pubkey": [], "mint": [], "amount": [], "decimals": []}
+        rows = self._decode_token_accounts(cfg, accounts)
+        if rows:
+            pubkeys, mints, amounts, decimals = zip(*rows)
+            columns = {
+                "pubkey": list(pubkeys),
+                "mint": list(mints),
+                "amount": list(amounts),
+                "decimals": list(decimals),
+            }
+        return columns
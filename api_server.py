@@ -2,26 +2,38 @@
 Minimal API server wiring the monitor into HTTP endpoints.
 
 Usage:
-  pip install fastapi uvicorn requests
-  uvicorn api_server:app --reload --port 8000
+  pip install fastapi "uvicorn[standard]" requests orjson "httpx[http2]" "pydantic>=2"
+  uvicorn api_server:app --reload --port 8000                                              # dev
+  uvicorn api_server:app --loop uvloop --http httptools --workers $(nproc) --port 8000     # prod
+
+"uvicorn[standard]" pulls in uvloop + httptools; plain uvicorn silently falls back to asyncio + h11.
 """
 
-import json
 import os
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
-
-import requests
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-
-from defi_monitor import VaultConfig, UserConfig, VoltrVaultMonitor
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import anyio.to_thread
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from starlette.datastructures import State
+
+from adapters.cache import SingleFlight, TTLCache
+from adapters.http_client import HttpSession, build_session
+from defi_monitor import Snapshot, VaultConfig, UserConfig, build_snapshot
 from adapters.vault.abstract import VaultAdapter
-from adapters.vault.voltr import VoltrAdapter
+from adapters.vault.voltr import USDC_MICRO, VoltrAdapter
 from risk.risk_factory import evaluate as evaluate_risk_model
 
 
 class SnapshotRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     adapter: str = Field(default="voltr", description="Which adapter to use (default: voltr).")
     vault_pubkey: str
     lp_mint: str
@@ -32,6 +44,13 @@ class SnapshotRequest(BaseModel):
     rpc_url: str = "https://api.mainnet-beta.solana.com"
     voltr_api_base: str = "https://api.voltr.xyz"
     include_token_accounts: bool = False
+    include_raw: bool = Field(default=False, description="Include the adapter's raw off-chain API payload.")
+
+    # Normalized once at parse time; adapters are registered under lowercase names.
+    @field_validator("adapter", mode="before")
+    @classmethod
+    def _lower_adapter(cls, v: object) -> object:
+        return v.lower() if isinstance(v, str) else v
 
 
 class MonitorRequest(BaseModel):
@@ -41,26 +60,216 @@ class MonitorRequest(BaseModel):
     lp_token_account is optional (fallback to registry default if present).
     """
 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     protocol: str = Field(default="voltr", description="Protocol/adapter name.")
     user_wallet: str = Field(..., description="User wallet address.")
     vault_id: Optional[str] = Field(default=None, description="Vault identifier (protocol-specific).")
     lp_token_account: Optional[str] = Field(default=None, description="User LP token account; optional.")
     include_token_accounts: bool = False
+    include_raw: bool = Field(default=False, description="Include the adapter's raw off-chain API payload.")
+
+    @field_validator("protocol", mode="before")
+    @classmethod
+    def _lower_protocol(cls, v: object) -> object:
+        return v.lower() if isinstance(v, str) else v
+
+
+# Upper bound on /monitor/batch items; larger pages should be split client-side.
+MAX_BATCH_ITEMS = 50
+
+
+class BatchMonitorRequest(BaseModel):
+    """
+    Several /monitor requests resolved in one round trip (e.g. a multi-vault dashboard page).
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    items: List[MonitorRequest] = Field(
+        ...,
+        max_length=MAX_BATCH_ITEMS,
+        description="Monitor requests; results are returned in the same order.",
+    )
+
+
+class VaultEntry(BaseModel):
+    """
+    One vault in config/vaults.json. Validated once at startup; unknown keys are kept.
+    """
+
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    vault_pubkey: str
+    lp_mint: str
+    idle_usdc_ata: str
+    usdc_mint: str
+    rpc_url: str
+    voltr_api_base: str
+    default_lp_token_account: Optional[str] = None
+    default_user_wallet: Optional[str] = None
+    display_name: Optional[str] = None
+    name: Optional[str] = None
+    chain: Optional[str] = None
+    type: str = "vault"
+    risk: Optional[str] = None
+    borrowed: Optional[float] = None
+
+
+def build_adapters(session: HttpSession) -> Dict[str, VaultAdapter]:
+    # Adapter registry; extend this dict when adding new protocols.
+    return {
+        "voltr": VoltrAdapter(session=session),
+    }
+
+
+# Assembled snapshots are pure reads; dashboards re-ask for the same payload many times per minute.
+# A short TTL turns repeats into memory lookups, and single-flight keeps concurrent misses
+# for the same key down to one upstream fetch.
+SNAPSHOT_CACHE = TTLCache(maxsize=1024, ttl=5)
+_snapshot_inflight = SingleFlight()
+
 
+def cached_snapshot(key: Hashable, build: Callable[[], Snapshot]) -> Snapshot:
+    cached = SNAPSHOT_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-session = requests.Session()
+    def build_and_store() -> Snapshot:
+        result = build()
+        SNAPSHOT_CACHE.set(key, result)
+        return result
 
-# Adapter registry; extend this dict when adding new protocols.
-ADAPTERS: Dict[str, VaultAdapter] = {
-    "voltr": VoltrAdapter(session=session),
-}
+    return _snapshot_inflight.do(key, build_and_store)
 
-app = FastAPI(title="Defi Monitor API", version="0.1.0")
+
+# Sync endpoints run on anyio's worker pool (40 threads by default); every in-flight snapshot
+# holds one of them while it waits on upstream I/O, so the default throttles concurrency.
+THREADPOOL_TOKENS = int(os.getenv("API_THREADPOOL_TOKENS", "100"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Per-worker setup/teardown. Nothing network- or file-bound runs at import, so
+    `--workers N` processes each build their own client pool and registry on start.
+    """
+    # Must run inside the event loop: the default limiter is per-loop.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+
+    state = app.state
+    # Process-wide HTTP client (HTTP/2 when available) so connections persist across requests.
+    state.session = build_session()
+    # Shared pool for fanning out adapter I/O; created once to avoid per-request thread spawn.
+    state.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="snapshot")
+    state.adapters = build_adapters(state.session)
+    state.registry = load_registry()
+    state.vault_index = build_vault_index(state.registry)
+    # Not awaited: startup does not wait on remote hosts; unstarted pings are dropped on shutdown.
+    warmup_futures = warmup(state.session, state.registry, state.executor)
+    try:
+        yield
+    finally:
+        for future in warmup_futures:
+            future.cancel()
+        state.executor.shutdown(wait=False)
+        state.session.close()
+        SNAPSHOT_CACHE.clear()
+
+
+# orjson serializes the nested snapshot dicts (and token account lists) much faster than json.dumps.
+# Endpoints deliberately carry no return annotation: FastAPI would turn it into a response_model
+# and validate every payload. Snapshot endpoints also wrap their result in ORJSONResponse
+# themselves, since a bare return value still goes through jsonable_encoder first; orjson
+# serializes the Snapshot dataclasses directly.
+app = FastAPI(
+    title="Defi Monitor API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 HARD_LIMIT_MULTIPLIER = 50
 SOFT_LIMIT_MULTIPLIER = 200
 
 
+_RISK_TEMPLATES: Mapping[str, Mapping[str, str]] = MappingProxyType(
+    {
+        "critical13": MappingProxyType(
+            {
+                "code": "critical13",
+                "label": "Critical 1+3",
+                "badge": "1+3",
+                "tooltip": "Rules 1 + 3: available < balance x 50 and utilization > 95% at the same time.",
+            }
+        ),
+        "critical1": MappingProxyType(
+            {
+                "code": "critical1",
+                "label": "Critical 1",
+                "badge": "1",
+                "tooltip": "Rule 1 (hard liquidity): available < balance x 50. Exit is highly constrained.",
+            }
+        ),
+        "warning2": MappingProxyType(
+            {
+                "code": "warning2",
+                "label": "Warning 2",
+                "badge": "2",
+                "tooltip": "Rule 2 (soft liquidity): available < balance x 200. Monitor exit liquidity.",
+            }
+        ),
+        "warning3": MappingProxyType(
+            {
+                "code": "warning3",
+                "label": "Warning 3",
+                "badge": "3",
+                "tooltip": "Rule 3 (hard utilization): utilization > 95%; lending is crowded.",
+            }
+        ),
+        "warning4": MappingProxyType(
+            {
+                "code": "warning4",
+                "label": "Warning 4",
+                "badge": "4",
+                "tooltip": "Rule 4 (soft utilization): utilization > 90%; approaching congestion.",
+            }
+        ),
+        "ok": MappingProxyType({"code": "ok", "label": "Low", "badge": "", "tooltip": "No risk rules triggered."}),
+    }
+)
+
+
+def _risk_code(rule1Hard: bool, rule2Soft: bool, rule3Hard: bool, rule4Soft: bool) -> str:
+    # Priority order of the frontend rules.
+    if rule1Hard and rule3Hard:
+        return "critical13"
+    if rule1Hard:
+        return "critical1"
+    if rule2Soft:
+        return "warning2"
+    if rule3Hard:
+        return "warning3"
+    if rule4Soft:
+        return "warning4"
+    return "ok"
+
+
+def _rules_from_mask(mask: int) -> Tuple[bool, bool, bool, bool]:
+    return bool(mask & 8), bool(mask & 4), bool(mask & 2), bool(mask & 1)
+
+
+# The four rule booleans form a 4-bit mask (rule1Hard<<3 | rule2Soft<<2 | rule3Hard<<1 | rule4Soft);
+# every outcome is precomputed once, indexed by that mask.
+_TEMPLATE_BY_MASK: Tuple[Mapping[str, str], ...] = tuple(
+    _RISK_TEMPLATES[_risk_code(*_rules_from_mask(mask))] for mask in range(16)
+)
+_CONDITIONS_BY_MASK: Tuple[Mapping[str, bool], ...] = tuple(
+    MappingProxyType(dict(zip(("rule1Hard", "rule2Soft", "rule3Hard", "rule4Soft"), _rules_from_mask(mask))))
+    for mask in range(16)
+)
+
+
 def evaluate_risk_status(utilization: float, available: float, balance_value: float) -> Dict[str, object]:
     """
     Mirror the frontend risk rules to keep consistent UX:
@@ -69,66 +278,42 @@ def evaluate_risk_status(utilization: float, available: float, balance_value: fl
       rule3Hard: utilization > 95%
       rule4Soft: utilization > 90%
     """
-    rule1Hard = available < balance_value * HARD_LIMIT_MULTIPLIER
-    rule2Soft = available < balance_value * SOFT_LIMIT_MULTIPLIER
-    rule3Hard = utilization > 95
-    rule4Soft = utilization > 90
+    mask = (
+        (available < balance_value * HARD_LIMIT_MULTIPLIER) << 3
+        | (available < balance_value * SOFT_LIMIT_MULTIPLIER) << 2
+        | (utilization > 95) << 1
+        | (utilization > 90)
+    )
+    # Fresh dicts: the templates are shared and read-only, and callers/serializers need plain dicts.
+    return {**_TEMPLATE_BY_MASK[mask], "conditions": dict(_CONDITIONS_BY_MASK[mask])}
 
-    if rule1Hard and rule3Hard:
-        return {
-            "code": "critical13",
-            "label": "Critical 1+3",
-            "badge": "1+3",
-            "tooltip": "Rules 1 + 3: available < balance x 50 and utilization > 95% at the same time.",
-            "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-        }
-    if rule1Hard:
-        return {
-            "code": "critical1",
-            "label": "Critical 1",
-            "badge": "1",
-            "tooltip": "Rule 1 (hard liquidity): available < balance x 50. Exit is highly constrained.",
-            "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-        }
-    if rule2Soft:
-        return {
-            "code": "warning2",
-            "label": "Warning 2",
-            "badge": "2",
-            "tooltip": "Rule 2 (soft liquidity): available < balance x 200. Monitor exit liquidity.",
-            "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-        }
-    if rule3Hard:
-        return {
-            "code": "warning3",
-            "label": "Warning 3",
-            "badge": "3",
-            "tooltip": "Rule 3 (hard utilization): utilization > 95%; lending is crowded.",
-            "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-        }
-    if rule4Soft:
-        return {
-            "code": "warning4",
-            "label": "Warning 4",
-            "badge": "4",
-            "tooltip": "Rule 4 (soft utilization): utilization > 90%; approaching congestion.",
-            "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-        }
 
-    return {
-        "code": "ok",
-        "label": "Low",
-        "badge": "",
-        "tooltip": "No risk rules triggered.",
-        "conditions": {"rule1Hard": rule1Hard, "rule2Soft": rule2Soft, "rule3Hard": rule3Hard, "rule4Soft": rule4Soft},
-    }
+Registry = Mapping[str, Mapping[str, VaultEntry]]
+
+# Built once: TypeAdapter compiles its validator on construction.
+_REGISTRY_ADAPTER = TypeAdapter(Dict[str, Dict[str, VaultEntry]])
+
+
+def _freeze_registry(parsed: Dict[str, Dict[str, VaultEntry]]) -> Registry:
+    """
+    Build a read-only registry with lowercase protocol keys, so lookups need no per-call normalization.
+    """
+    return MappingProxyType({proto.lower(): MappingProxyType(vaults) for proto, vaults in parsed.items()})
+
+
+@lru_cache(maxsize=1)
+def _read_registry(path: str) -> Registry:
+    # Structure and required fields are checked here, once, instead of surfacing as KeyError mid-request.
+    return _freeze_registry(_REGISTRY_ADAPTER.validate_json(Path(path).read_bytes()))
 
-def load_registry() -> Dict[str, Dict[Optional[str], Dict[str, str]]]:
+
+def load_registry() -> Registry:
     """
-    Load vault registry from JSON. Falls back to inline defaults if file missing/invalid.
-    Allows overriding path via VAULT_CONFIG_PATH.
+    Load vault registry from JSON. Falls back to inline defaults only if the file is missing;
+    a file that fails validation raises (pydantic ValidationError) so bad config stops startup.
+    Allows overriding path via VAULT_CONFIG_PATH. The parsed file is cached per path.
     """
-    default_registry: Dict[str, Dict[Optional[str], Dict[str, str]]] = {}
+    default_registry: Dict[str, Dict[str, Dict[str, str]]] = {}
 
     # Inline fallback using prior defaults
     fallback_vault_cfg = VaultConfig(
@@ -157,68 +342,95 @@ def load_registry() -> Dict[str, Dict[Optional[str], Dict[str, str]]]:
         }
     }
 
-    path = Path(os.getenv("VAULT_CONFIG_PATH", "config/vaults.json"))
+    path = os.getenv("VAULT_CONFIG_PATH", "config/vaults.json")
     try:
-        raw = json.loads(path.read_text())
-        # Basic validation shape
-        if not isinstance(raw, dict):
-            raise ValueError("vaults.json must be an object at root")
-        return raw  # type: ignore[return-value]
-    except Exception:
-        return default_registry
+        return _read_registry(path)
+    except FileNotFoundError:
+        return _freeze_registry(_REGISTRY_ADAPTER.validate_python(default_registry))
 
 
-VAULT_REGISTRY: Dict[str, Dict[Optional[str], Dict[str, str]]] = load_registry()
+def build_vault_index(registry: Registry) -> Dict[Tuple[str, str], VaultConfig]:
+    """
+    Pre-build VaultConfig objects keyed by (protocol, vault_id) so handlers do one hash lookup.
+    """
+    return {
+        (proto, vault_id): VaultConfig(
+            vault_pubkey=entry.vault_pubkey,
+            lp_mint=entry.lp_mint,
+            idle_usdc_ata=entry.idle_usdc_ata,
+            usdc_mint=entry.usdc_mint,
+            rpc_url=entry.rpc_url,
+            voltr_api_base=entry.voltr_api_base,
+        )
+        for proto, vaults in registry.items()
+        for vault_id, entry in vaults.items()
+    }
 
 
-def resolve_adapter(name: str) -> VaultAdapter:
-    adapter = ADAPTERS.get(name.lower())
+def resolve_adapter(adapters: Mapping[str, VaultAdapter], name: str) -> VaultAdapter:
+    """Look up an adapter by its already-lowercased name."""
+    adapter = adapters.get(name)
     if not adapter:
-        raise HTTPException(status_code=400, detail=f"Unknown adapter '{name}'. Available: {list(ADAPTERS)}")
+        raise HTTPException(status_code=400, detail=f"Unknown adapter '{name}'. Available: {list(adapters)}")
     return adapter
 
 
-def attach_summary(snapshot: Dict[str, object], vault_cfg_raw: Dict[str, str], adapter_name: str) -> Dict[str, object]:
+def attach_summary(snapshot: Snapshot, entry: Optional[VaultEntry], adapter_name: str) -> Snapshot:
     """
     Guarantee UI-friendly fields are present (name, chain, risk, balance, totalLiquidity, borrowed, myDeposit).
+    `entry` is None for bring-your-own-params snapshots, which then get the defaults.
     """
-    sources = snapshot.get("sources", {}) if isinstance(snapshot, dict) else {}
-    onchain = sources.get("onchain_idle", {}) if isinstance(sources, dict) else {}
-    offchain = sources.get("offchain", {}) if isinstance(sources, dict) else {}
-
-    onchain_data = onchain.get("data") if isinstance(onchain, dict) else None
-    offchain_data = offchain.get("data") if isinstance(offchain, dict) else None
+    onchain_data = snapshot.sources.onchain_idle.get("data")
+    offchain_data = snapshot.sources.offchain.get("data")
 
     vault_nav_idle = 0.0
     user_lp = 0.0
     withdrawable = 0.0
+    withdrawable_micro: Optional[int] = None
+    vault_nav_idle_micro: Optional[int] = None
+    idle_ratio = 0.0
 
     if isinstance(onchain_data, dict):
         vault_nav_idle = float(onchain_data.get("vault_nav_idle", 0.0) or 0.0)
         user_lp = float(onchain_data.get("user_lp", 0.0) or 0.0)
+        idle_ratio = float(onchain_data.get("idle_ratio", 0.0) or 0.0)
+        vault_nav_idle_micro = onchain_data.get("vault_nav_idle_micro")
     if isinstance(offchain_data, dict):
         withdrawable = float(offchain_data.get("withdrawable_usdc", 0.0) or 0.0)
-
-    display_name = vault_cfg_raw.get("display_name") or vault_cfg_raw.get("name") or f"{adapter_name} vault"
-    chain = vault_cfg_raw.get("chain") or "UNKNOWN"
+        withdrawable_micro = offchain_data.get("withdrawable_usdc_micro")
+
+    if entry is not None:
+        display_name = entry.display_name or entry.name or f"{adapter_name} vault"
+        chain = entry.chain or "UNKNOWN"
+        borrowed = entry.borrowed or 0.0
+        protocol_type = entry.type
+    else:
+        display_name = f"{adapter_name} vault"
+        chain = "UNKNOWN"
+        borrowed = 0.0
+        protocol_type = "vault"
     balance_value = withdrawable if withdrawable else vault_nav_idle or user_lp
 
-    borrowed = float(vault_cfg_raw.get("borrowed", 0.0) or 0.0)
     total_liquidity = vault_nav_idle or borrowed  # fallback to avoid div by zero
     available = max(total_liquidity - borrowed, 0.0)
     utilization = (borrowed / total_liquidity * 100) if total_liquidity else 0.0
+    deployment_rate = 1.0 - idle_ratio
     risk_status = evaluate_risk_status(utilization=utilization, available=available, balance_value=balance_value)
-    protocol_type = vault_cfg_raw.get("type", "vault")
-    risk_model = evaluate_risk_model(
-        protocol_type,
-        {
-            "utilization": utilization,
-            "available": available,
-            "balance_value": balance_value,
-            "idle_ratio": idle_ratio,
-            "deployment_rate": deployment_rate,
-        },
-    )
+    model_metrics: Dict[str, float] = {
+        "utilization": utilization,
+        "available": available,
+        "balance_value": balance_value,
+        "idle_ratio": idle_ratio,
+        "deployment_rate": deployment_rate,
+    }
+    if withdrawable and withdrawable_micro is not None and vault_nav_idle_micro is not None:
+        # Both sides come from raw integer amounts (off-chain balance, on-chain idle ATA), so
+        # liquidity rules compare exact micro-USDC; only the configured `borrowed` is converted.
+        borrowed_micro = round(borrowed * USDC_MICRO)
+        total_liquidity_micro = vault_nav_idle_micro or borrowed_micro
+        model_metrics["balance_value_micro"] = withdrawable_micro
+        model_metrics["available_micro"] = max(total_liquidity_micro - borrowed_micro, 0)
+    risk_model = evaluate_risk_model(protocol_type, model_metrics)
 
     summary = {
         "name": display_name,
@@ -232,23 +444,53 @@ def attach_summary(snapshot: Dict[str, object], vault_cfg_raw: Dict[str, str], a
         "riskModel": risk_model,
     }
 
-    snapshot["summary"] = summary
+    snapshot.summary = summary
     return snapshot
 
 
+def _warmup_request(send: Callable[..., object], url: str, **kwargs: object) -> None:
+    try:
+        send(url, timeout=5, **kwargs)
+    except Exception:  # noqa: BLE001 - warmup is best-effort
+        pass
+
+
+def warmup(session: HttpSession, registry: Registry, executor: Executor) -> List[Future]:
+    """
+    Open connections to every configured RPC / Voltr API host so the first request
+    skips the TCP+TLS handshake. Best-effort: failures are ignored.
+    Each host is pinged concurrently on the executor; the returned futures are not meant
+    to be awaited, only cancelled on shutdown.
+    """
+    entries = [entry for vaults in registry.values() for entry in vaults.values()]
+    rpc_urls = {entry.rpc_url for entry in entries}
+    api_bases = {entry.voltr_api_base for entry in entries}
+    health = {"jsonrpc": "2.0", "id": 0, "method": "getHealth", "params": []}
+    futures = [executor.submit(_warmup_request, session.post, url, json=health) for url in rpc_urls]
+    futures += [executor.submit(_warmup_request, session.get, url) for url in api_bases]
+    return futures
+
+
 @app.get("/health")
-def health() -> Dict[str, object]:
+def health(request: Request):
+    state = request.app.state
     return {
         "ok": True,
-        "adapters": list(ADAPTERS.keys()),
-        "vaults": {proto: list(vaults.keys()) for proto, vaults in VAULT_REGISTRY.items()},
+        "adapters": list(state.adapters.keys()),
+        "vaults": {proto: list(vaults.keys()) for proto, vaults in state.registry.items()},
     }
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    return {"ok": True, "snapshot_cache": SNAPSHOT_CACHE.stats()}
+
+
 @app.post("/snapshot")
-def snapshot(payload: SnapshotRequest) -> Dict[str, object]:
-    adapter = resolve_adapter(payload.adapter)
-    monitor = VoltrVaultMonitor(session=session, adapter=adapter)
+def snapshot(payload: SnapshotRequest, request: Request):
+    state = request.app.state
+    adapter_name = payload.adapter
+    adapter = resolve_adapter(state.adapters, adapter_name)
 
     vault_cfg = VaultConfig(
         vault_pubkey=payload.vault_pubkey,
@@ -260,64 +502,132 @@ def snapshot(payload: SnapshotRequest) -> Dict[str, object]:
     )
     user_cfg = UserConfig(wallet=payload.wallet, lp_token_account=payload.lp_token_account)
 
-    snap = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=payload.include_token_accounts)
-    return attach_summary(snap, vault_cfg_raw, adapter_name=payload.adapter)
+    def build() -> Snapshot:
+        snap = build_snapshot(
+            adapter,
+            vault_cfg,
+            user_cfg,
+            include_token_accounts=payload.include_token_accounts,
+            include_raw=payload.include_raw,
+            executor=state.executor,
+        )
+        # Bring-your-own params: no registry entry, so the summary uses its defaults.
+        return attach_summary(snap, None, adapter_name=adapter_name)
 
+    # Everything that shapes the response is in the key, including the caller-supplied endpoints.
+    key = ("snapshot", adapter_name, vault_cfg, user_cfg, payload.include_token_accounts, payload.include_raw)
+    return ORJSONResponse(cached_snapshot(key, build))
 
-# Frontend-friendly: use server-side registry; client only sends protocol + user.
-@app.post("/monitor")
-def monitor_endpoint(payload: MonitorRequest) -> Dict[str, object]:
-    adapter = resolve_adapter(payload.protocol)
-    vaults_for_proto = VAULT_REGISTRY.get(payload.protocol, {})
-    vault_cfg_raw = vaults_for_proto.get(payload.vault_id)
-    if not vault_cfg_raw:
+
+def run_monitor(state: State, payload: MonitorRequest) -> Snapshot:
+    """
+    Resolve a registry-backed monitor request into a summarized snapshot.
+    Shared by /monitor and /monitor/batch.
+    """
+    protocol = payload.protocol
+    adapter = resolve_adapter(state.adapters, protocol)
+    vault_id = payload.vault_id or "default"
+    vault_cfg = state.vault_index.get((protocol, vault_id))
+    if vault_cfg is None:
+        vaults_for_proto = state.registry.get(protocol, {})
         raise HTTPException(
             status_code=400,
-            detail=f"Unknown vault for protocol '{payload.protocol}' and vault_id '{payload.vault_id}'. Available: {list(vaults_for_proto.keys())}",
+            detail=f"Unknown vault for protocol '{payload.protocol}' and vault_id '{vault_id}'. Available: {list(vaults_for_proto.keys())}",
         )
+    entry = state.registry[protocol][vault_id]
 
-    vault_cfg = VaultConfig(
-        vault_pubkey=vault_cfg_raw["vault_pubkey"],
-        lp_mint=vault_cfg_raw["lp_mint"],
-        idle_usdc_ata=vault_cfg_raw["idle_usdc_ata"],
-        usdc_mint=vault_cfg_raw["usdc_mint"],
-        rpc_url=vault_cfg_raw["rpc_url"],
-        voltr_api_base=vault_cfg_raw["voltr_api_base"],
-    )
-
-    lp_token_account = payload.lp_token_account or vault_cfg_raw.get("default_lp_token_account")
+    lp_token_account = payload.lp_token_account or entry.default_lp_token_account
     if not lp_token_account:
         raise HTTPException(status_code=400, detail="lp_token_account is required for this protocol.")
 
     user_cfg = UserConfig(wallet=payload.user_wallet, lp_token_account=lp_token_account)
-    monitor = VoltrVaultMonitor(session=session, adapter=adapter)
-    snap = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=payload.include_token_accounts)
-    return attach_summary(snap, vault_cfg_raw, adapter_name=payload.protocol)
+
+    def build() -> Snapshot:
+        snap = build_snapshot(
+            adapter,
+            vault_cfg,
+            user_cfg,
+            include_token_accounts=payload.include_token_accounts,
+            include_raw=payload.include_raw,
+            executor=state.executor,
+        )
+        return attach_summary(snap, entry, adapter_name=protocol)
+
+    key = (
+        "monitor",
+        protocol,
+        vault_id,
+        payload.user_wallet,
+        lp_token_account,
+        payload.include_token_accounts,
+        payload.include_raw,
+    )
+    return cached_snapshot(key, build)
+
+
+# Frontend-friendly: use server-side registry; client only sends protocol + user.
+@app.post("/monitor")
+def monitor_endpoint(payload: MonitorRequest, request: Request):
+    return ORJSONResponse(run_monitor(request.app.state, payload))
+
+
+@app.post("/monitor/batch")
+def monitor_batch_endpoint(payload: BatchMonitorRequest, request: Request):
+    """
+    Fan out several /monitor requests concurrently. Each item is isolated: a failing
+    item yields {"ok": False, "error": ...} without affecting the others.
+    """
+    if not payload.items:
+        return {"ok": True, "results": []}
+
+    state = request.app.state
+    results: List[Dict[str, object]] = []
+    # Items share the executor with their own source fetches; build_snapshot runs any source
+    # the pool has not started yet in the item's thread, so a full pool cannot deadlock.
+    futures = [state.executor.submit(run_monitor, state, item) for item in payload.items]
+    for future in futures:
+        try:
+            results.append({"ok": True, "data": future.result(), "error": None})
+        except HTTPException as exc:
+            results.append({"ok": False, "data": None, "error": exc.detail})
+        except Exception as exc:  # noqa: BLE001 - per-item error isolation
+            results.append({"ok": False, "data": None, "error": str(exc)})
+
+    return ORJSONResponse({"ok": True, "results": results})
 
 
 # Convenience: GET endpoint using server defaults (env-driven)
 @app.get("/snapshot")
-def snapshot_default(include_token_accounts: bool = False, adapter: str = "voltr") -> Dict[str, object]:
-    adapter_obj = resolve_adapter(adapter)
-    monitor = VoltrVaultMonitor(session=session, adapter=adapter_obj)
+def snapshot_default(
+    request: Request,
+    include_token_accounts: bool = False,
+    adapter: str = "voltr",
+    include_raw: bool = False,
+):
+    state = request.app.state
+    adapter = adapter.lower()
+    vault_adapter = resolve_adapter(state.adapters, adapter)
     # Use registry default for the adapter if available
-    vaults_for_proto = VAULT_REGISTRY.get(adapter, {})
-    vault_cfg_raw = vaults_for_proto.get("default")
-    if not vault_cfg_raw:
+    vault_cfg = state.vault_index.get((adapter, "default"))
+    if vault_cfg is None:
         raise HTTPException(status_code=400, detail=f"No default vault configured for adapter '{adapter}'.")
+    entry = state.registry[adapter]["default"]
 
-    vault_cfg = VaultConfig(
-        vault_pubkey=vault_cfg_raw["vault_pubkey"],
-        lp_mint=vault_cfg_raw["lp_mint"],
-        idle_usdc_ata=vault_cfg_raw["idle_usdc_ata"],
-        usdc_mint=vault_cfg_raw["usdc_mint"],
-        rpc_url=vault_cfg_raw["rpc_url"],
-        voltr_api_base=vault_cfg_raw["voltr_api_base"],
-    )
     user_cfg = UserConfig(
-        wallet=vault_cfg_raw.get("default_user_wallet", "51pijqibmHQ17GZWjV8g8AyFWx1ZMmkUDtFR4Vz8Ah3F"),
-        lp_token_account=vault_cfg_raw.get("default_lp_token_account", "BKCANLpd7r1k1dkki4Wj48kJZXd7CFFEzNnZXQGTrMk1"),
+        wallet=entry.default_user_wallet or "51pijqibmHQ17GZWjV8g8AyFWx1ZMmkUDtFR4Vz8Ah3F",
+        lp_token_account=entry.default_lp_token_account or "BKCANLpd7r1k1dkki4Wj48kJZXd7CFFEzNnZXQGTrMk1",
     )
 
-    snap = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=include_token_accounts)
-    return attach_summary(snap, vault_cfg_raw, adapter_name=adapter)
+    def build() -> Snapshot:
+        snap = build_snapshot(
+            vault_adapter,
+            vault_cfg,
+            user_cfg,
+            include_token_accounts=include_token_accounts,
+            include_raw=include_raw,
+            executor=state.executor,
+        )
+        return attach_summary(snap, entry, adapter_name=adapter)
+
+    key = ("monitor", adapter, "default", user_cfg.wallet, user_cfg.lp_token_account, include_token_accounts, include_raw)
+    return ORJSONResponse(cached_snapshot(key, build))
@@ -1,14 +1,14 @@
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
-
-import requests
+from concurrent.futures import Executor
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Optional
 
+from adapters.http_client import HttpSession, build_session
 from adapters.vault.abstract import VaultAdapter
 from adapters.vault.voltr import VoltrAdapter
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VaultConfig:
     """Static configuration for a single vault."""
 
@@ -20,7 +20,7 @@ class VaultConfig:
     voltr_api_base: str = "https://api.voltr.xyz"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UserConfig:
     """User-scoped inputs."""
 
@@ -28,86 +28,171 @@ class UserConfig:
     lp_token_account: str
 
 
+@dataclass(slots=True)
+class VaultInfo:
+    pubkey: str
+    lp_mint: str
+    idle_usdc_ata: str
+    usdc_mint: str
+
+
+@dataclass(slots=True)
+class UserInfo:
+    wallet: str
+    lp_token_account: str
+
+
+@dataclass(slots=True)
+class Sources:
+    onchain_idle: Dict[str, Any]
+    offchain: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class Meta:
+    rpc_url: str
+    voltr_api_base: str
+    adapter: str
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """
+    Unified snapshot. Fixed-schema slotted dataclasses instead of nested literal dicts;
+    orjson serializes them natively, so the API never converts them to dicts.
+    """
+
+    timestamp: int
+    vault: VaultInfo
+    user: UserInfo
+    sources: Sources
+    meta: Meta
+    debug: Optional[Dict[str, Any]] = None
+    summary: Optional[Dict[str, Any]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for scripts; `debug` / `summary` are omitted when unset."""
+        out: Dict[str, Any] = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is None:
+                continue
+            if f.name in ("vault", "user", "sources", "meta"):
+                value = {sub.name: getattr(value, sub.name) for sub in fields(value)}
+            out[f.name] = value
+        return out
+
+
+def _source(fetch: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+    try:
+        return fetch(*args)
+    except Exception as exc:  # noqa: BLE001 - we want to capture and return the error
+        return {"ok": False, "data": None, "error": str(exc)}
+
+
+def build_snapshot(
+    adapter: VaultAdapter,
+    cfg: VaultConfig,
+    user_cfg: UserConfig,
+    include_token_accounts: bool = False,
+    include_raw: bool = False,
+    executor: Optional[Executor] = None,
+) -> Snapshot:
+    """
+    Return a single Snapshot consumable by the defi monitor.
+    The off-chain `raw` API payload is dropped unless include_raw is set.
+    With an executor, on-chain, off-chain and token-account fetches run concurrently.
+
+    Shape (serialized):
+      {
+        "timestamp": 1234567890,
+        "vault": {...},
+        "user": {...},
+        "sources": {
+          "onchain_idle": {"ok": bool, "data": {...} | None, "error": str | None},
+          "offchain": {"ok": bool, "data": {...} | None, "error": str | None}
+        },
+        "meta": {...},
+        "debug": {...} | None
+      }
+    """
+    debug: Dict[str, Any] = {}
+
+    token_accounts_future = None
+    if executor is not None:
+        # All sources are independent network calls; overlap their latency.
+        if include_token_accounts:
+            token_accounts_future = executor.submit(adapter.list_token_accounts, cfg)
+        onchain_future = executor.submit(_source, adapter.onchain_snapshot, cfg, user_cfg)
+        # The calling thread would otherwise just block on the futures; fetch one source here
+        # instead, which saves a pool slot and a thread handoff per snapshot.
+        offchain = _source(adapter.offchain_snapshot, cfg, user_cfg)
+        # A task the pool has not started yet (e.g. every worker busy with /monitor/batch items)
+        # is run here instead of waited on, so callers that are themselves pool workers never block.
+        if onchain_future.cancel():
+            onchain = _source(adapter.onchain_snapshot, cfg, user_cfg)
+        else:
+            onchain = onchain_future.result()
+    else:
+        onchain = _source(adapter.onchain_snapshot, cfg, user_cfg)
+        offchain = _source(adapter.offchain_snapshot, cfg, user_cfg)
+
+    offchain_data = offchain.get("data")
+    if not include_raw and isinstance(offchain_data, dict) and "raw" in offchain_data:
+        offchain = {**offchain, "data": {k: v for k, v in offchain_data.items() if k != "raw"}}
+
+    if include_token_accounts:
+        try:
+            if token_accounts_future is not None and not token_accounts_future.cancel():
+                debug["token_accounts"] = token_accounts_future.result()
+            else:
+                debug["token_accounts"] = adapter.list_token_accounts(cfg)
+        except Exception as exc:  # noqa: BLE001
+            debug["token_accounts_error"] = str(exc)
+
+    return Snapshot(
+        timestamp=int(time.time()),
+        vault=VaultInfo(cfg.vault_pubkey, cfg.lp_mint, cfg.idle_usdc_ata, cfg.usdc_mint),
+        user=UserInfo(user_cfg.wallet, user_cfg.lp_token_account),
+        sources=Sources(onchain, offchain),
+        meta=Meta(cfg.rpc_url, cfg.voltr_api_base, getattr(adapter, "name", "unknown")),
+        debug=debug or None,
+    )
+
+
 class VoltrVaultMonitor:
     """
     Light abstraction around the existing investigation scripts.
 
-    - Uses an adapter so different protocols can plug in their own logic.
-    - Provides snapshot() with a unified return shape.
+    Kept for scripts that hold a monitor object; it only binds an adapter (and an
+    optional executor) to build_snapshot() and returns the plain-dict shape.
+    The API server calls build_snapshot directly.
     """
 
     def __init__(
         self,
-        session: Optional[requests.Session] = None,
+        session: Optional[HttpSession] = None,
         adapter: Optional[VaultAdapter] = None,
+        executor: Optional[Executor] = None,
     ) -> None:
-        session = session or requests.Session()
-        self.adapter = adapter or VoltrAdapter(session=session)
-
-    # --- Unified snapshot ---
-    def snapshot(self, cfg: VaultConfig, user_cfg: UserConfig, include_token_accounts: bool = False) -> Dict[str, Any]:
-        """
-        Return a single dict consumable by the defi monitor.
-
-        Shape:
-          {
-            "timestamp": "...",
-            "vault": {...},
-            "user": {...},
-            "sources": {
-              "onchain_idle": {"ok": bool, "data": {...} | None, "error": str | None},
-              "voltr_api": {"ok": bool, "data": {...} | None, "error": str | None}
-            },
-            "debug": {...} # optional
-          }
-        """
-        onchain = {"ok": False, "data": None, "error": None}
-        offchain = {"ok": False, "data": None, "error": None}
-        debug: Dict[str, Any] = {}
-
-        try:
-            onchain = self.adapter.onchain_snapshot(cfg, user_cfg)
-        except Exception as exc:  # noqa: BLE001 - we want to capture and return the error
-            onchain = {"ok": False, "data": None, "error": str(exc)}
-
-        try:
-            offchain = self.adapter.offchain_snapshot(cfg, user_cfg)
-        except Exception as exc:  # noqa: BLE001
-            offchain = {"ok": False, "data": None, "error": str(exc)}
+        self.adapter = adapter or VoltrAdapter(session=session or build_session())
+        self.executor = executor
 
-        if include_token_accounts:
-            try:
-                debug["token_accounts"] = self.adapter.list_token_accounts(cfg)
-            except Exception as exc:  # noqa: BLE001
-                debug["token_accounts_error"] = str(exc)
-
-        snapshot = {
-            "timestamp": int(time.time()),
-            "vault": {
-                "pubkey": cfg.vault_pubkey,
-                "lp_mint": cfg.lp_mint,
-                "idle_usdc_ata": cfg.idle_usdc_ata,
-                "usdc_mint": cfg.usdc_mint,
-            },
-            "user": {
-                "wallet": user_cfg.wallet,
-                "lp_token_account": user_cfg.lp_token_account,
-            },
-            "sources": {
-                "onchain_idle": onchain,
-                "offchain": offchain,
-            },
-            "meta": {
-                "rpc_url": cfg.rpc_url,
-                "voltr_api_base": cfg.voltr_api_base,
-                "adapter": getattr(self.adapter, "name", "unknown"),
-            },
-        }
-
-        if debug:
-            snapshot["debug"] = debug
-
-        return snapshot
+    def snapshot(
+        self,
+        cfg: VaultConfig,
+        user_cfg: UserConfig,
+        include_token_accounts: bool = False,
+        include_raw: bool = False,
+    ) -> Dict[str, Any]:
+        return build_snapshot(
+            self.adapter,
+            cfg,
+            user_cfg,
+            include_token_accounts=include_token_accounts,
+            include_raw=include_raw,
+            executor=self.executor,
+        ).as_dict()
 
 
 # Example usage (kept minimal; do not run network calls on import)
@@ -124,5 +209,5 @@ if __name__ == "__main__":
     )
 
     monitor = VoltrVaultMonitor()
-    result = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=True)
+    result = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=True, include_raw=True)
     print(result)
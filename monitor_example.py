@@ -16,7 +16,7 @@ user_cfg = UserConfig(
 
 def main() -> None:
     monitor = VoltrVaultMonitor()
-    snap = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=True)
+    snap = monitor.snapshot(vault_cfg, user_cfg, include_token_accounts=True, include_raw=True)
 
     print("=== Snapshot ===")
     print("Timestamp:", snap["timestamp"])
@@ -1,4 +1,6 @@
-from typing import Dict, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 HARD_LIMIT_MULTIPLIER = 50
 SOFT_LIMIT_MULTIPLIER = 200
@@ -12,13 +14,43 @@ def evaluate(metrics: Dict[str, float]) -> Dict[str, object]:
       utilization: percent (0-100)
       available: liquidity available
       balance_value: user balance value (for liquidity rules)
+      available_micro / balance_value_micro: optional integer micro-units; when both are
+        present the liquidity rules compare these exactly instead of the floats
     """
     utilization = float(metrics.get("utilization", 0.0) or 0.0)
     available = float(metrics.get("available", 0.0) or 0.0)
     balance_value = float(metrics.get("balance_value", 0.0) or 0.0)
 
-    rule1Hard = available < balance_value * HARD_LIMIT_MULTIPLIER
-    rule2Soft = available < balance_value * SOFT_LIMIT_MULTIPLIER
+    available_micro = metrics.get("available_micro")
+    balance_value_micro = metrics.get("balance_value_micro")
+    liquidity_micro = None
+    if available_micro is not None and balance_value_micro is not None:
+        liquidity_micro = (int(available_micro), int(balance_value_micro))
+
+    result = _evaluate_cached(utilization, available, balance_value, liquidity_micro)
+    # Cached entries are frozen; hand out a plain copy (orjson can't serialize mappingproxy).
+    return {
+        "level": result["level"],
+        "reasons": list(result["reasons"]),
+        "metrics": dict(result["metrics"]),
+        "conditions": dict(result["conditions"]),
+    }
+
+
+@lru_cache(maxsize=256)
+def _evaluate_cached(
+    utilization: float,
+    available: float,
+    balance_value: float,
+    liquidity_micro: Optional[Tuple[int, int]] = None,
+) -> Mapping[str, object]:
+    if liquidity_micro is not None:
+        available_micro, balance_value_micro = liquidity_micro
+        rule1Hard = available_micro < balance_value_micro * HARD_LIMIT_MULTIPLIER
+        rule2Soft = available_micro < balance_value_micro * SOFT_LIMIT_MULTIPLIER
+    else:
+        rule1Hard = available < balance_value * HARD_LIMIT_MULTIPLIER
+        rule2Soft = available < balance_value * SOFT_LIMIT_MULTIPLIER
     rule3Hard = utilization > 95
     rule4Soft = utilization > 90
 
@@ -35,18 +67,24 @@ def evaluate(metrics: Dict[str, float]) -> Dict[str, object]:
         level = "soft"
         reasons.append("liquidity/utilization warning")
 
-    return {
-        "level": level,
-        "reasons": reasons,
-        "metrics": {
-            "utilization": utilization,
-            "available": available,
-            "balance_value": balance_value,
-        },
-        "conditions": {
-            "rule1Hard": rule1Hard,
-            "rule2Soft": rule2Soft,
-            "rule3Hard": rule3Hard,
-            "rule4Soft": rule4Soft,
-        },
-    }
+    return MappingProxyType(
+        {
+            "level": level,
+            "reasons": tuple(reasons),
+            "metrics": MappingProxyType(
+                {
+                    "utilization": utilization,
+                    "available": available,
+                    "balance_value": balance_value,
+                }
+            ),
+            "conditions": MappingProxyType(
+                {
+                    "rule1Hard": rule1Hard,
+                    "rule2Soft": rule2Soft,
+                    "rule3Hard": rule3Hard,
+                    "rule4Soft": rule4Soft,
+                }
+            ),
+        }
+    )
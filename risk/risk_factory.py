@@ -1,16 +1,22 @@
-from typing import Dict
+from typing import Callable, Dict
 
 from . import lending_rules, lp_rules, vault_rules
 
+_DISPATCH: Dict[str, Callable[[Dict[str, float]], Dict[str, object]]] = {
+    "lending": lending_rules.evaluate,
+    "lend": lending_rules.evaluate,
+    "money-market": lending_rules.evaluate,
+    "lp": lp_rules.evaluate,
+    "amm": lp_rules.evaluate,
+    "pool": lp_rules.evaluate,
+}
+
 
 def evaluate(protocol_type: str, metrics: Dict[str, float]) -> Dict[str, object]:
     """
     Dispatch to protocol-specific risk model.
     """
-    proto = (protocol_type or "").lower()
-    if proto in ("lending", "lend", "money-market"):
-        return lending_rules.evaluate(metrics)
-    if proto in ("lp", "amm", "pool"):
-        return lp_rules.evaluate(metrics)
+    # Exact match first: registry types are already lowercase, so .lower() is only the fallback.
+    model = _DISPATCH.get(protocol_type) or _DISPATCH.get((protocol_type or "").lower())
     # default to vault model
-    return vault_rules.evaluate(metrics)
+    return (model or vault_rules.evaluate)(metrics)
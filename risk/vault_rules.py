@@ -1,4 +1,28 @@
-from typing import Dict, List
+import math
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Union
+
+# Thresholds in basis points of NAV.
+BPS = 10_000
+IDLE_HARD_BPS = 500  # idle_ratio < 5%
+IDLE_SOFT_BPS = 2000  # idle_ratio < 20%
+DEPLOYMENT_HARD_BPS = 9500  # deployment_rate > 95%
+DEPLOYMENT_SOFT_BPS = 8000  # deployment_rate > 80%
+
+
+def _floor_bps(ratio: float) -> Union[int, float]:
+    # floor(x * BPS) < T  <=>  x * BPS < T for integer T, so "<" checks keep their meaning
+    # (up to one float ulp right at a threshold). Non-finite values are passed through so they
+    # compare like the raw floats did.
+    scaled = ratio * BPS
+    return math.floor(scaled) if math.isfinite(scaled) else scaled
+
+
+def _ceil_bps(ratio: float) -> Union[int, float]:
+    # ceil(x * BPS) > T  <=>  x * BPS > T for integer T, so ">" checks keep their meaning.
+    scaled = ratio * BPS
+    return math.ceil(scaled) if math.isfinite(scaled) else scaled
 
 
 def evaluate(metrics: Dict[str, float]) -> Dict[str, object]:
@@ -17,21 +41,40 @@ def evaluate(metrics: Dict[str, float]) -> Dict[str, object]:
     idle_ratio = float(metrics.get("idle_ratio", 0.0) or 0.0)
     deployment_rate = float(metrics.get("deployment_rate", 0.0) or 0.0)
 
+    result = _evaluate_cached(idle_ratio, deployment_rate)
+    # Cached entries are frozen; hand out a plain copy (orjson can't serialize mappingproxy).
+    return {
+        "level": result["level"],
+        "reasons": list(result["reasons"]),
+        "metrics": dict(result["metrics"]),
+    }
+
+
+@lru_cache(maxsize=256)
+def _evaluate_cached(idle_ratio: float, deployment_rate: float) -> Mapping[str, object]:
+    idle_bps = _floor_bps(idle_ratio)
+    deployment_bps = _ceil_bps(deployment_rate)
+
     reasons: List[str] = []
     level = "ok"
 
-    if idle_ratio < 0.05 or deployment_rate > 0.95:
+    # Reason strings are only formatted on the branch that reports them.
+    if idle_bps < IDLE_HARD_BPS or deployment_bps > DEPLOYMENT_HARD_BPS:
         reasons.append(f"idle_ratio only {idle_ratio:.2%} / deployment_rate {deployment_rate:.2%}")
         level = "hard"
-    elif idle_ratio < 0.2 or deployment_rate > 0.8:
+    elif idle_bps < IDLE_SOFT_BPS or deployment_bps > DEPLOYMENT_SOFT_BPS:
         reasons.append(f"idle_ratio low {idle_ratio:.2%} / deployment_rate {deployment_rate:.2%}")
         level = "soft"
 
-    return {
-        "level": level,
-        "reasons": reasons,
-        "metrics": {
-            "idle_ratio": idle_ratio,
-            "deployment_rate": deployment_rate,
-        },
-    }
+    return MappingProxyType(
+        {
+            "level": level,
+            "reasons": tuple(reasons),
+            "metrics": MappingProxyType(
+                {
+                    "idle_ratio": idle_ratio,
+                    "deployment_rate": deployment_rate,
+                }
+            ),
+        }
+    )
@@ -13,8 +13,17 @@ voltr_vault_inspect.py
 你可以先用這支確認邏輯，之後再包成 FastAPI / Flask endpoint。
 """
 
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+
+import orjson
 import requests
-from typing import Any, Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from urllib3.util.retry import Retry
 
 # ==============================
 # 基本設定：Solana RPC & Voltr API
@@ -26,6 +35,18 @@ RPC = "https://api.mainnet-beta.solana.com"
 # Voltr 公開 API base URL
 VOLTR_API_BASE = "https://api.voltr.xyz"
 
+# 共用 HTTP Session：重用 keep-alive 連線，避免每次 RPC 都重新做 TCP + TLS handshake。
+# 429 / 5xx 會自動重試（JSON-RPC 讀取是 idempotent，所以 POST 也可以重試）。
+_SESSION = requests.Session()
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.2,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=frozenset({"GET", "POST"}),
+)
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY)
+_SESSION.mount("https://", _HTTP_ADAPTER)
+
 # ==============================
 # Vault / User 參數（你目前這個 vault）
 # ==============================
@@ -53,6 +74,18 @@ USER_LP_ATA = "BKCANLpd7r1k1dkki4Wj48kJZXd7CFFEzNnZXQGTrMk1"
 # 通用：Solana RPC Helper
 # ==============================
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@lru_cache(maxsize=64)
+def _rpc_prefix(method: str) -> bytes:
+    """
+    每個 method 的 request body 前半段都是固定的，只序列化一次：
+      b'{"jsonrpc":"2.0","id":1,"method":"getTokenAccountBalance","params":'
+    """
+    return b'{"jsonrpc":"2.0","id":1,"method":' + orjson.dumps(method) + b',"params":'
+
+
 def rpc(method: str, params: List[Any]) -> Dict[str, Any]:
     """
     呼叫 Solana JSON-RPC 的共用 helper。
@@ -69,20 +102,48 @@ def rpc(method: str, params: List[Any]) -> Dict[str, Any]:
 
     若 RPC 回傳 error，會丟 RuntimeError。
     """
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params,
-    }
-    r = requests.post(RPC, json=payload)
+    # 只有 params 需要每次序列化；直接送 bytes，跳過 requests 內部的 json= 編碼
+    body = _rpc_prefix(method) + orjson.dumps(params) + b"}"
+    r = _SESSION.post(RPC, data=body, headers=_JSON_HEADERS, timeout=5)
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
     if "error" in data:
         raise RuntimeError(f"RPC error: {data['error']}")
     return data
 
 
+def rpc_batch(calls: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """
+    一次送出多個 Solana JSON-RPC 呼叫（JSON-RPC batch）。
+
+    calls: [(method, params), ...]
+
+    整批只需要一次 HTTP round trip。
+    回傳順序與 calls 相同（規格允許 server 打亂順序，所以這裡依 id 重新排序）。
+    任何一筆回傳 error，會丟 RuntimeError。
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    r = _SESSION.post(RPC, data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=5)
+    r.raise_for_status()
+    data = orjson.loads(r.content)
+    if not isinstance(data, list):
+        raise RuntimeError(f"RPC batch error: {data}")
+
+    by_id = {item.get("id"): item for item in data}
+    results: List[Dict[str, Any]] = []
+    for i in range(len(calls)):
+        item = by_id.get(i)
+        if item is None:
+            raise RuntimeError(f"RPC batch response missing id {i}")
+        if "error" in item:
+            raise RuntimeError(f"RPC error: {item['error']}")
+        results.append(item)
+    return results
+
+
 def get_account_info(address: str, encoding: str = "base64") -> Optional[Dict[str, Any]]:
     """
     讀取任意帳戶的 AccountInfo。
@@ -98,10 +159,116 @@ def get_account_info(address: str, encoding: str = "base64") -> Optional[Dict[st
     return resp.get("result", {}).get("value")
 
 
+# getMultipleAccounts 單次最多 100 個地址
+MAX_MULTIPLE_ACCOUNTS = 100
+
+
+def get_multiple_accounts(addresses: List[str], encoding: str = "jsonParsed") -> List[Optional[Dict[str, Any]]]:
+    """
+    一次讀取多個帳戶的 AccountInfo（getMultipleAccounts），取代逐一呼叫 get_account_info。
+
+    超過 100 個地址會自動切批，每批一次 round trip。
+    回傳：與 addresses 同順序的 list，找不到的帳戶為 None。
+    """
+    accounts: List[Optional[Dict[str, Any]]] = []
+    for start in range(0, len(addresses), MAX_MULTIPLE_ACCOUNTS):
+        chunk = addresses[start : start + MAX_MULTIPLE_ACCOUNTS]
+        resp = rpc("getMultipleAccounts", [chunk, {"encoding": encoding}])
+        accounts.extend(resp.get("result", {}).get("value") or [None] * len(chunk))
+    return accounts
+
+
+# ==============================
+# 通用：以 slot 為單位的快取
+# ==============================
+
+# 一個 Solana slot 約 400ms；鏈上狀態最多每個 slot 變一次，所以結果保留一個 slot 的時間。
+# 不另外打 getSlot 來當 key：那樣冷啟動要多一次 RPC，而 TTL 本身就等於「同一個 slot 內共用」。
+SLOT_TTL_SECONDS = 0.4
+
+
+class _SlotCache:
+    """
+    以 address 為 key、TTL 為一個 slot（SLOT_TTL_SECONDS）的小型快取，附 single-flight：
+
+    - 同一個 slot 內重複查詢，直接回傳上次結果
+    - 多個 thread 同時查同一個 key，只有第一個真的打 RPC，其它人等它的結果
+    - 過期的資料下次查詢時重抓；超過 maxsize 依 LRU 擠掉
+    """
+
+    def __init__(self, maxsize: int = 32, ttl: float = SLOT_TTL_SECONDS) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: Hashable) -> Tuple[bool, Any]:
+        # 呼叫端要先拿 lock
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return False, None
+        return True, entry[1]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._fresh(key)[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit, value = self._fresh(key)
+            if hit:
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+# vault_pubkey -> (vault_nav_idle, lp_supply)
+_VAULT_IDLE_CACHE = _SlotCache()
+# user_lp_ata -> user_lp
+_USER_LP_CACHE = _SlotCache()
+
+
 # ==============================
 # 通用：SPL Token 相關 Helper
 # ==============================
 
+def _ui_amount(resp: Dict[str, Any]) -> float:
+    """
+    從 getTokenAccountBalance / getTokenSupply 的回傳中取出 uiAmount。
+    """
+    value = resp.get("result", {}).get("value")
+    if not value:
+        return 0.0
+    return float(value.get("uiAmount", 0.0))
+
+
 def get_token_balance(token_account: str) -> float:
     """
     取得某個 SPL Token Account 的餘額（uiAmount，已處理 decimals）。
@@ -111,10 +278,7 @@ def get_token_balance(token_account: str) -> float:
     回傳：float，例如 1.234567 USDC
     """
     resp = rpc("getTokenAccountBalance", [token_account])
-    value = resp.get("result", {}).get("value")
-    if not value:
-        return 0.0
-    return float(value.get("uiAmount", 0.0))
+    return _ui_amount(resp)
 
 
 def get_token_supply(mint: str) -> float:
@@ -126,10 +290,7 @@ def get_token_supply(mint: str) -> float:
     回傳：float，例如 LP 總供給 9_037_456.396002
     """
     resp = rpc("getTokenSupply", [mint])
-    value = resp.get("result", {}).get("value")
-    if not value:
-        return 0.0
-    return float(value.get("uiAmount", 0.0))
+    return _ui_amount(resp)
 
 
 def get_token_accounts_by_owner(owner: str) -> List[Dict[str, Any]]:
@@ -167,6 +328,22 @@ def get_token_accounts_by_owner(owner: str) -> List[Dict[str, Any]]:
     return resp.get("result", {}).get("value", [])
 
 
+def iter_token_account_fields(
+    accounts: List[Dict[str, Any]],
+) -> Iterator[Tuple[Optional[str], Optional[str], Optional[float], Optional[int]]]:
+    """
+    從 getTokenAccountsByOwner 的結果中，只取出用得到的欄位：
+      (pubkey, mint, uiAmount, decimals)
+
+    逐筆 yield，呼叫端不用自己一層層 .get() 整棵 jsonParsed 結構，
+    也不會另外建出一份完整的中間 list。
+    """
+    for acc in accounts:
+        info = acc.get("account", {}).get("data", {}).get("parsed", {}).get("info", {})
+        token_amount = info.get("tokenAmount", {})
+        yield acc.get("pubkey"), info.get("mint"), token_amount.get("uiAmount"), token_amount.get("decimals")
+
+
 # ==============================
 # Vault：鏈上 idle 資訊（只看 USDC）
 # ==============================
@@ -214,10 +391,24 @@ def get_lp_price_and_share_idle_only(user_lp_ata: str) -> Dict[str, float]:
     注意：
     - 這個 LP 價格不會等於前端顯示的 NAV 價格，
       因為它沒有把外部倉位（外部協議）算進來。
-    """
-    vault_nav_idle = get_vault_nav_idle_only()
-    lp_supply = get_token_supply(VAULT_LP_MINT)
-    user_lp = get_user_lp_amount(user_lp_ata)
+    - 三個數字用同一個 JSON-RPC batch 取得，只花一次 round trip。
+    - 結果快取一個 slot 的時間（約 400ms）：這段時間內的重複輪詢不會再打 RPC，
+      vault 部分（NAV / supply）所有使用者共用，只有 user_lp 依使用者分開。
+    """
+    def fetch_vault_and_user() -> Tuple[float, float]:
+        idle_resp, supply_resp, user_lp_resp = rpc_batch(
+            [
+                ("getTokenAccountBalance", [VAULT_IDLE_USDC_ATA]),
+                ("getTokenSupply", [VAULT_LP_MINT]),
+                ("getTokenAccountBalance", [user_lp_ata]),
+            ]
+        )
+        # 同一個 batch 順便拿到的 user_lp 也先放進快取
+        _USER_LP_CACHE.set(user_lp_ata, _ui_amount(user_lp_resp))
+        return _ui_amount(idle_resp), _ui_amount(supply_resp)
+
+    vault_nav_idle, lp_supply = _VAULT_IDLE_CACHE.get_or_fetch(VAULT_PUBKEY, fetch_vault_and_user)
+    user_lp = _USER_LP_CACHE.get_or_fetch(user_lp_ata, lambda: get_token_balance(user_lp_ata))
 
     if lp_supply <= 0:
         return {
@@ -256,7 +447,8 @@ def get_user_withdrawable_idle_only(user_lp_ata: str) -> Dict[str, float]:
     share_idle = base["share_idle"]
 
     withdrawable_idle = user_lp * lp_price_idle
-    idle_usdc = get_vault_idle_usdc()
+    # idle-only NAV 就是 idle USDC ATA 的餘額，直接沿用 batch 的結果，不再多打一次 RPC
+    idle_usdc = vault_nav_idle
     idle_ratio = (idle_usdc / vault_nav_idle) if vault_nav_idle > 0 else 0.0
 
     return {
@@ -314,16 +506,7 @@ def list_vault_token_accounts_by_authority() -> None:
         print("No SPL token accounts found for this authority.")
         return
 
-    for i, acc in enumerate(accounts):
-        pubkey = acc.get("pubkey")
-        data = acc.get("account", {}).get("data", {})
-        parsed = data.get("parsed", {})
-        info = parsed.get("info", {})
-        mint = info.get("mint")
-        token_amount = info.get("tokenAmount", {})
-        ui_amount = token_amount.get("uiAmount")
-        decimals = token_amount.get("decimals")
-
+    for i, (pubkey, mint, ui_amount, decimals) in enumerate(iter_token_account_fields(accounts)):
         print(f"[{i}] {pubkey}")
         print(f"     mint:   {mint}")
         print(f"     amount: {ui_amount} (decimals={decimals})")
@@ -341,12 +524,31 @@ def get_voltr_user_balance_raw(vault_pubkey: str, user_pubkey: str) -> Dict[str,
     回傳完整 JSON，用來 debug / 觀察欄位。
     """
     url = f"{VOLTR_API_BASE}/vault/{vault_pubkey}/user/{user_pubkey}/balance"
-    r = requests.get(url)
+    r = _SESSION.get(url, timeout=5)
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
     return data
 
 
+# USDC 有 6 位小數：1 USDC = 1_000_000 micro-USDC
+USDC_MICRO = 1_000_000
+
+
+def get_voltr_user_withdrawable_usdc_micro(vault_pubkey: str, user_pubkey: str) -> int:
+    """
+    從 Voltr API 取得「真實可提領 USDC」，以最小單位（micro-USDC，int）回傳。
+
+    userAssetAmount 本來就是整數；保持整數可以做精確比較，
+    大額部位也不會有 float 精度問題。需要顯示時再除以 USDC_MICRO。
+    """
+    raw = get_voltr_user_balance_raw(vault_pubkey, user_pubkey)
+
+    if not raw.get("success"):
+        raise RuntimeError(f"Voltr API returned error: {raw}")
+
+    return int(raw["data"]["userAssetAmount"])
+
+
 def get_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str) -> float:
     """
     從 Voltr API 取得「真實可提領 USDC 數量」（含外部倉位 NAV）。
@@ -366,15 +568,8 @@ def get_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str) -> flo
     這個數字會對齊 Voltr 前端「My Position / Withdrawable」顯示，
     比你用 idle-only 計算的結果更接近實際可提領金額。
     """
-    raw = get_voltr_user_balance_raw(vault_pubkey, user_pubkey)
-
-    if not raw.get("success"):
-        raise RuntimeError(f"Voltr API returned error: {raw}")
-
-    user_asset_amount = raw["data"]["userAssetAmount"]
-    withdrawable_usdc = user_asset_amount / 1_000_000  # USDC 6 decimals
-
-    return withdrawable_usdc
+    # 只在最後顯示時才轉成 float
+    return get_voltr_user_withdrawable_usdc_micro(vault_pubkey, user_pubkey) / USDC_MICRO
 
 
 # ==============================
@@ -412,7 +607,19 @@ def debug_account(address: str) -> None:
     - 看 data.program（例如 "spl-token"）
     - 若是 SPL Token，印出 mint / token owner / amount
     """
-    info = get_account_info(address, encoding="jsonParsed")
+    _print_account(address, get_account_info(address, encoding="jsonParsed"))
+
+
+def debug_accounts(addresses: List[str]) -> None:
+    """
+    debug_account 的批次版：用 getMultipleAccounts 一次讀完所有地址，
+    不用每個地址各打一次 getAccountInfo。
+    """
+    for address, info in zip(addresses, get_multiple_accounts(addresses)):
+        _print_account(address, info)
+
+
+def _print_account(address: str, info: Optional[Dict[str, Any]]) -> None:
     if not info:
         print(f"{address}: account not found")
         return
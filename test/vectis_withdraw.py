@@ -1,8 +1,27 @@
+import atexit
+import binascii
+import functools
+import os
+import random
+import threading
+import time
+import orjson
 import requests
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+try:
+    import httpx
+except ImportError:  # 沒裝 httpx 就全部走 requests
+    httpx = None
 
 # === RPC & API Config ===
-RPC = "https://api.mainnet-beta.solana.com"
+# 公用 mainnet-beta 限流很兇，有自己的 RPC 就用 SOLANA_RPC 指過去
+RPC = os.environ.get("SOLANA_RPC", "https://api.mainnet-beta.solana.com")
+# 同時打 RPC 的請求上限（平行的 probe / race 共用），避免彼此擠出 429
+RPC_CONCURRENCY = int(os.environ.get("SOLANA_RPC_CONCURRENCY", "8"))
 VOLTR_API_BASE = "https://api.voltr.xyz"
 
 # === Voltr Vault Config（這個 vault） ===
@@ -15,92 +34,402 @@ USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
 USER_WALLET = "51pijqibmHQ17GZWjV8g8AyFWx1ZMmkUDtFR4Vz8Ah3F"
 USER_LP_ATA_DEFAULT = "BKCANLpd7r1k1dkki4Wj48kJZXd7CFFEzNnZXQGTrMk1"
 
+HTTP_TIMEOUT = 10
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# === 共用 HTTP 連線 ===
+# RPC：共用一個 keep-alive Session，不用每次 RPC 都重新做 TCP + TLS handshake
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=max(8, RPC_CONCURRENCY)))
+_rpc_sem = threading.BoundedSemaphore(RPC_CONCURRENCY)
+
+
+def _build_voltr_client() -> Any:
+    # Voltr API：有 httpx（含 h2）就用 HTTP/2，同時多個請求共用一條 TLS 連線；否則沿用 _session
+    if httpx is not None:
+        try:
+            return httpx.Client(http2=True, timeout=HTTP_TIMEOUT)
+        except ImportError:  # httpx 有裝但缺 h2
+            pass
+    return _session
+
+
+_voltr_http = _build_voltr_client()
+
+
+# === TTL cache：依資料更新頻率給不同 TTL ===
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def ttl_cache(seconds: float) -> Callable[[F], F]:
+    # 像 functools.lru_cache，但每筆結果只保留 seconds 秒；以位置 / keyword 參數為 key。
+    # 丟 exception 的呼叫不會被快取。同一個 key 同時 miss 時只有第一個真的呼叫，其他等它的結果。
+    def decorator(fn: F) -> F:
+        entries: Dict[Any, Tuple[float, Any]] = {}
+        inflight: Dict[Any, "Future[Any]"] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    return entry[1]
+                future = inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    inflight[key] = future
+            if not leader:
+                return future.result()
+
+            try:
+                value = fn(*args, **kwargs)
+            except BaseException as exc:
+                with lock:
+                    inflight.pop(key, None)
+                future.set_exception(exc)
+                raise
+            with lock:
+                entries[key] = (time.monotonic() + seconds, value)
+                inflight.pop(key, None)
+            future.set_result(value)
+            return value
+
+        def cache_clear() -> None:
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+# === RPC retry：公用 mainnet-beta 常常 429 / 5xx，或節點落後 ===
+RPC_MAX_ATTEMPTS = 5
+RPC_BACKOFF_BASE = 0.25
+RPC_BACKOFF_MAX = 8.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# -32005 node behind / -32007 slot skipped / -32014 block status not yet available
+RETRY_RPC_ERROR_CODES = {-32005, -32007, -32014}
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Retry-After 可能是秒數，也可能是 HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    # 指數退避 + jitter；server 有給 Retry-After 就至少等那麼久（同樣封頂 RPC_BACKOFF_MAX）
+    delay = min(RPC_BACKOFF_MAX, RPC_BACKOFF_BASE * 2**attempt) + random.random() * RPC_BACKOFF_BASE
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RPC_BACKOFF_MAX))
+    return delay
+
+
+def _is_retryable_rpc_error(data: Dict[str, Any]) -> bool:
+    return (data.get("error") or {}).get("code") in RETRY_RPC_ERROR_CODES
+
+
+def _post_rpc_body(body: bytes) -> Any:
+    # 只在送出請求期間佔用名額；backoff sleep 時不佔
+    with _rpc_sem:
+        return _session.post(RPC, data=body, headers=_JSON_HEADERS, timeout=HTTP_TIMEOUT)
+
+
+def _check_rpc_status(r: Any) -> None:
+    if r.status_code >= 400:
+        raise RuntimeError(f"RPC HTTP {r.status_code}: {r.content[:200]!r}")
+
+
+def _rpc_post(body: bytes) -> Any:
+    # POST 到 RPC，暫時性錯誤（連線失敗、429/5xx、節點落後）用 backoff 重試；body 只序列化一次，重試共用
+    for attempt in range(RPC_MAX_ATTEMPTS - 1):
+        try:
+            r = _post_rpc_body(body)
+        except (requests.ConnectionError, requests.Timeout):
+            time.sleep(_backoff_delay(attempt))
+            continue
+
+        # 直接看 status code，不走 raise_for_status：429 很常見，沒必要每次都建 HTTPError + traceback
+        if r.status_code in RETRY_STATUS_CODES:
+            time.sleep(_backoff_delay(attempt, _retry_after_seconds(r.headers.get("Retry-After"))))
+            continue
+        _check_rpc_status(r)
+
+        data = orjson.loads(r.content)
+        if _is_retryable_rpc_error(data):
+            time.sleep(_backoff_delay(attempt))
+            continue
+        return data
+
+    # 最後一次不再重試，錯誤照原樣往上丟
+    r = _post_rpc_body(body)
+    _check_rpc_status(r)
+    return orjson.loads(r.content)
+
 
 # === Solana RPC Helpers ===
+@functools.lru_cache(maxsize=None)
+def _rpc_prefix(method: str) -> bytes:
+    # 每個 method 固定的前半段 JSON，只組一次
+    return b'{"jsonrpc":"2.0","id":1,"method":' + orjson.dumps(method) + b',"params":'
+
+
 def rpc(method: str, params: List[Any]) -> Dict[str, Any]:
-    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
-    r = requests.post(RPC, json=payload)
-    r.raise_for_status()
-    data = r.json()
+    # 只有 params 需要每次序列化
+    data = _rpc_post(_rpc_prefix(method) + orjson.dumps(params) + b"}")
     if "error" in data:
         raise RuntimeError(f"RPC error: {data['error']}")
     return data
 
 
-def get_token_balance(account: str) -> float:
-    r = rpc("getTokenAccountBalance", [account])
-    value = r.get("result", {}).get("value")
-    if not value:
-        return 0.0
-    return float(value.get("uiAmount", 0.0))
+# === 不會變的鏈上資料：idle ATA 的 token owner、mint decimals ===
+# 讀到就記在 process 裡，結束時寫到磁碟，下次啟動直接載入，不用再打 RPC。
+# 檔案裡按 RPC endpoint 分開存（devnet / 自架節點的資料不會混到 mainnet），
+# 超過 STATIC_CACHE_MAX_AGE 就整段丟掉重抓；VECTIS_CACHE_PATH 設成空字串則完全不讀寫磁碟（測試用）
+STATIC_CACHE_PATH = os.environ.get("VECTIS_CACHE_PATH", os.path.expanduser("~/.cache/vectis/authority.json"))
+STATIC_CACHE_MAX_AGE = 24 * 3600
 
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
 
-def get_token_supply(mint: str) -> float:
-    r = rpc("getTokenSupply", [mint])
-    value = r.get("result", {}).get("value")
-    if not value:
-        return 0.0
-    return float(value.get("uiAmount", 0.0))
+_authority_by_ata: Dict[str, str] = {}
+_mint_decimals: Dict[str, int] = {}
+_loaded_static: Tuple[Dict[str, str], Dict[str, int]] = ({}, {})
+
+
+def _is_pubkey(value: Any) -> bool:
+    # base58 且解出來剛好 32 bytes 才算合法的 Solana pubkey
+    if not isinstance(value, str) or not value or any(c not in _B58_ALPHABET for c in value):
+        return False
+    n = 0
+    for c in value:
+        n = n * 58 + _B58_ALPHABET.index(c)
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    return leading_zeros + (n.bit_length() + 7) // 8 == 32
+
+
+def _is_decimals(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 255
+
+
+def _load_static_cache() -> None:
+    global _loaded_static
+    if not STATIC_CACHE_PATH:
+        return
+    try:
+        with open(STATIC_CACHE_PATH, "rb") as f:
+            data = orjson.loads(f.read())
+        section = data.get(RPC) or {}
+        if time.time() - section.get("saved_at", 0) > STATIC_CACHE_MAX_AGE:
+            return
+        # 不合法的值直接略過，之後用到時會重新打 RPC 拿
+        authority = {k: v for k, v in section.get("authority", {}).items() if _is_pubkey(k) and _is_pubkey(v)}
+        decimals = {k: v for k, v in section.get("decimals", {}).items() if _is_pubkey(k) and _is_decimals(v)}
+    except (OSError, ValueError, AttributeError, TypeError):
+        return  # 沒有檔案或壞掉就當作冷啟動
+    _authority_by_ata.update(authority)
+    _mint_decimals.update(decimals)
+    _loaded_static = (dict(authority), dict(decimals))
+
+
+def _save_static_cache() -> None:
+    if not STATIC_CACHE_PATH or (_authority_by_ata, _mint_decimals) == _loaded_static:
+        return  # 沒有新資料就不改檔案，saved_at 維持第一次抓到的時間
+    try:
+        try:
+            with open(STATIC_CACHE_PATH, "rb") as f:
+                data = orjson.loads(f.read())
+            # 只留各 RPC 的段落；舊版沒分 endpoint 的 authority / decimals 一併丟掉
+            data = {k: v for k, v in data.items() if isinstance(v, dict) and "saved_at" in v}
+        except (OSError, ValueError, AttributeError):
+            data = {}
+        data[RPC] = {"saved_at": time.time(), "authority": _authority_by_ata, "decimals": _mint_decimals}
+        os.makedirs(os.path.dirname(STATIC_CACHE_PATH) or ".", exist_ok=True)
+        tmp_path = STATIC_CACHE_PATH + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, STATIC_CACHE_PATH)
+    except OSError:
+        pass  # 寫不進去只是下次冷啟動，不影響結果
+
+
+_load_static_cache()
+atexit.register(_save_static_cache)
+
+
+def get_mint_decimals(mint: str) -> int:
+    cached = _mint_decimals.get(mint)
+    if cached is not None:
+        return cached
+    return get_token_supply_raw(mint)[1]
+
+
+# === 金額一律用 raw u64（int）+ decimals 計算，最後顯示時才除一次 10**decimals ===
+def _raw_amount(token_amount: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    # {"amount": "123456", "decimals": 6, ...} -> (123456, 6)；uiAmount 是 float，會掉精度所以不用。
+    # 帳戶不存在（None）視為 0；存在但缺欄位就讓它 KeyError，不要默默變成 0
+    if token_amount is None:
+        return 0, 0
+    return int(token_amount["amount"]), token_amount["decimals"]
 
 
-def get_account_info(address: str, encoding: str = "base64") -> Optional[Dict[str, Any]]:
-    r = rpc("getAccountInfo", [address, {"encoding": encoding}])
+def _to_ui(raw: int, decimals: int) -> float:
+    return raw / 10**decimals
+
+
+def _value_raw_amount(r: Dict[str, Any]) -> Tuple[int, int]:
+    # getTokenSupply 回應的 (amount, decimals)
+    return _raw_amount(r.get("result", {}).get("value"))
+
+
+@ttl_cache(seconds=60)  # LP supply 變化以分鐘計
+def get_token_supply_raw(mint: str) -> Tuple[int, int]:
+    supply, decimals = _value_raw_amount(rpc("getTokenSupply", [mint]))
+    _mint_decimals[mint] = decimals
+    return supply, decimals
+
+
+def get_account_info(address: str) -> Optional[Dict[str, Any]]:
+    # 用到的欄位都在 jsonParsed 裡，不用自己解 base64
+    r = rpc("getAccountInfo", [address, {"encoding": "jsonParsed"}])
     return r.get("result", {}).get("value")
 
 
+def get_multiple_token_accounts_parsed(addresses: List[str]) -> List[Optional[Dict[str, Any]]]:
+    # 一次 getMultipleAccounts（jsonParsed）讀多個 SPL token / mint account，回傳每個帳戶的 parsed info
+    # （token account 含 mint / owner / tokenAmount，mint 含 supply / decimals），找不到的為 None
+    r = rpc("getMultipleAccounts", [addresses, {"encoding": "jsonParsed"}])
+    return [_parsed_token_info(acc) for acc in r.get("result", {}).get("value") or [None] * len(addresses)]
+
+
+def _parsed_token_info(account: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not account:
+        return None
+    data = account.get("data")
+    if not isinstance(data, dict):
+        return None
+    return data.get("parsed", {}).get("info")
+
+
+def _info_raw_amount(info: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    if info is None:
+        return 0, 0
+    return _raw_amount(info["tokenAmount"])
+
+
+def _mint_raw_supply(info: Dict[str, Any]) -> Tuple[int, int]:
+    # mint 帳戶的 parsed info：{"supply": "123456", "decimals": 6, ...}
+    return int(info["supply"]), info["decimals"]
+
+
 # === 找出真正的 token authority（你剛剛已經跑過一次） ===
 def get_vault_token_authority() -> str:
-    info = get_account_info(VAULT_IDLE_USDC_ATA, encoding="jsonParsed")
+    cached = _authority_by_ata.get(VAULT_IDLE_USDC_ATA)
+    if cached:
+        return cached
+
+    info = get_account_info(VAULT_IDLE_USDC_ATA)
     if not info:
         raise RuntimeError("Idle USDC ATA not found")
 
     parsed = info["data"]["parsed"]
     owner = parsed["info"]["owner"]
+    _authority_by_ata[VAULT_IDLE_USDC_ATA] = owner
     return owner
 
 
-def get_token_accounts_by_owner(owner: str) -> List[Dict[str, Any]]:
+# SPL token account layout：mint(0..32) | owner(32..64) | amount u64 LE(64..72) | ...
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_ACCOUNT_SIZE = 165
+
+
+def b58encode(raw: bytes) -> str:
+    n = int.from_bytes(raw, "big")
+    out = []
+    while n:
+        n, rem = divmod(n, 58)
+        out.append(_B58_ALPHABET[rem])
+    leading_zeros = len(raw) - len(raw.lstrip(b"\0"))
+    return "1" * leading_zeros + "".join(reversed(out))
+
+
+def get_token_balances_by_owner(owner: str) -> List[Tuple[str, str, int]]:
+    """
+    列出 owner 底下所有 SPL token account 的 (pubkey, mint, raw amount)。
+
+    用 getProgramAccounts + dataSlice 只拿每個帳戶的前 72 bytes（mint / owner / amount），
+    本地解碼；不像 jsonParsed 會把整個 parsed 帳戶資料都傳回來。
+    """
     r = rpc(
-        "getTokenAccountsByOwner",
+        "getProgramAccounts",
         [
-            owner,
-            {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
-            {"encoding": "jsonParsed"},
+            TOKEN_PROGRAM_ID,
+            {
+                "encoding": "base64",
+                "dataSlice": {"offset": 0, "length": 72},
+                "filters": [
+                    {"dataSize": TOKEN_ACCOUNT_SIZE},
+                    {"memcmp": {"offset": 32, "bytes": owner}},
+                ],
+            },
         ],
     )
-    return r.get("result", {}).get("value", [])
+    balances: List[Tuple[str, str, int]] = []
+    for acc in r.get("result") or []:
+        buf = binascii.a2b_base64(acc["account"]["data"][0])
+        balances.append((acc["pubkey"], b58encode(buf[:32]), int.from_bytes(buf[64:72], "little")))
+    return balances
 
 
 # === On-chain NAV（只看 idle 的版本） ===
-def get_vault_idle_usdc() -> float:
-    return get_token_balance(VAULT_IDLE_USDC_ATA)
-
-
-def get_vault_nav_onchain_only() -> float:
-    # 目前只含 idle；真正 NAV 會遠大於這個數字
-    return get_vault_idle_usdc()
-
-
-def get_user_lp_amount(user_lp_ata: str) -> float:
-    return get_token_balance(user_lp_ata)
+def get_lp_price_and_share_onchain(user_lp_ata: str) -> Dict[str, float]:
+    # idle ATA + user LP ATA + LP mint 一個 getMultipleAccounts 讀完；
+    # mint 帳戶的 parsed info 就有 supply / decimals，不用再打 getTokenSupply
+    idle_info, user_lp_info, lp_mint_info = get_multiple_token_accounts_parsed(
+        [VAULT_IDLE_USDC_ATA, user_lp_ata, VAULT_LP_MINT]
+    )
+    # vault 這邊的帳戶一定要在；user 沒有 LP ATA 就是持有 0
+    if idle_info is None:
+        raise RuntimeError("Idle USDC ATA not found")
+    if lp_mint_info is None:
+        raise RuntimeError("LP mint not found")
+
+    vault_nav_raw, usdc_decimals = _info_raw_amount(idle_info)  # 目前 NAV 只含 idle
+    lp_supply_raw, lp_decimals = _mint_raw_supply(lp_mint_info)
+    user_lp_raw, _ = _info_raw_amount(user_lp_info)
+
+    vault_nav = _to_ui(vault_nav_raw, usdc_decimals)
+    lp_supply = _to_ui(lp_supply_raw, lp_decimals)
+    user_lp = _to_ui(user_lp_raw, lp_decimals)
+    raw = {
+        "vault_nav_raw": vault_nav_raw,
+        "lp_supply_raw": lp_supply_raw,
+        "user_lp_raw": user_lp_raw,
+        "usdc_decimals": usdc_decimals,
+        "lp_decimals": lp_decimals,
+    }
 
+    # 同一份回應裡已經有 idle ATA 的 token owner（vault authority），順便記下來
+    _authority_by_ata[VAULT_IDLE_USDC_ATA] = idle_info["owner"]
+    _mint_decimals[USDC_MINT] = usdc_decimals
+    _mint_decimals[VAULT_LP_MINT] = lp_decimals
 
-def get_lp_price_and_share_onchain(user_lp_ata: str) -> Dict[str, float]:
-    vault_nav = get_vault_nav_onchain_only()
-    lp_supply = get_token_supply(VAULT_LP_MINT)
-    user_lp = get_user_lp_amount(user_lp_ata)
-
-    if lp_supply <= 0:
-        return {
-            "vault_nav": vault_nav,
-            "lp_supply": lp_supply,
-            "user_lp": user_lp,
-            "lp_price": 0.0,
-            "share": 0.0,
-        }
-
-    lp_price = vault_nav / lp_supply
-    share = user_lp / lp_supply
+    # int / int 的 true division 只 round 一次；不要先轉成 uiAmount 再相除。
+    # LP supply 為 0 會 ZeroDivisionError，跟缺資料一樣交給呼叫端（CLI 的 probe）處理
+    lp_price = (vault_nav_raw * 10**lp_decimals) / (lp_supply_raw * 10**usdc_decimals)
+    share = user_lp_raw / lp_supply_raw
 
     return {
         "vault_nav": vault_nav,
@@ -108,6 +437,7 @@ def get_lp_price_and_share_onchain(user_lp_ata: str) -> Dict[str, float]:
         "user_lp": user_lp,
         "lp_price": lp_price,
         "share": share,
+        **raw,
     }
 
 
@@ -120,8 +450,11 @@ def get_user_withdrawable_onchain(user_lp_ata: str) -> Dict[str, float]:
     lp_price = base["lp_price"]
     share = base["share"]
 
-    withdrawable = user_lp * lp_price
-    idle_usdc = get_vault_idle_usdc()
+    # 可提領金額全程整數運算（USDC base units，無條件捨去），顯示時才轉成 USDC
+    withdrawable_raw = base["user_lp_raw"] * base["vault_nav_raw"] // base["lp_supply_raw"]
+    withdrawable = _to_ui(withdrawable_raw, base["usdc_decimals"])
+    # NAV 就是 idle USDC 餘額，沿用 batch 結果，不再多打一次 RPC
+    idle_usdc = vault_nav
     idle_ratio = (idle_usdc / vault_nav) if vault_nav > 0 else 0.0
 
     return {
@@ -131,81 +464,238 @@ def get_user_withdrawable_onchain(user_lp_ata: str) -> Dict[str, float]:
         "lp_price": lp_price,
         "share": share,
         "withdrawable": withdrawable,
+        "withdrawable_raw": withdrawable_raw,
         "idle_usdc": idle_usdc,
         "idle_ratio": idle_ratio,
     }
 
 
 # === Voltr REST API：真正的 NAV / user balance ===
+# 同一組 vault/user 正在打的請求；平行的呼叫端（CLI probe、race）等同一個結果，不重複打 API
+_voltr_balance_inflight: Dict[Tuple[str, str], "Future[Dict[str, Any]]"] = {}
+_voltr_balance_lock = threading.Lock()
+
+
 def get_voltr_user_balance(vault_pubkey: str, user_pubkey: str) -> Dict[str, Any]:
     """
     打 Voltr 官方 API:
       GET /vault/{pubkey}/user/{userPubkey}/balance
 
-    回傳格式官方沒在 docs 寫死，我這裡先把整包 JSON 回傳給你，
-    你可以 print 出來看 field 名稱，再微調 parsing。
+    回傳整包 JSON；要可提領 USDC 用 parse_withdrawable() 從同一份回應取。
     """
-    url = f"{VOLTR_API_BASE}/vault/{vault_pubkey}/user/{user_pubkey}/balance"
-    r = requests.get(url)
-    r.raise_for_status()
-    data = r.json()
-    return data
+    key = (vault_pubkey, user_pubkey)
+    with _voltr_balance_lock:
+        future = _voltr_balance_inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _voltr_balance_inflight[key] = future
+    if not leader:
+        return future.result()
 
+    try:
+        url = f"{VOLTR_API_BASE}/vault/{vault_pubkey}/user/{user_pubkey}/balance"
+        r = _voltr_http.get(url, timeout=HTTP_TIMEOUT)
+        r.raise_for_status()
+        data = orjson.loads(r.content)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(data)
+        return data
+    finally:
+        with _voltr_balance_lock:
+            _voltr_balance_inflight.pop(key, None)
+
+
+def parse_withdrawable(resp: Dict[str, Any]) -> float:
+    # /balance 回應 -> 可提領 USDC
+    if not resp.get("success"):
+        raise RuntimeError(f"Voltr API returned error: {resp}")
+    raw_amount = resp["data"]["userAssetAmount"]
+    # 依照 USDC decimals 轉成浮點（USDC 固定 6 位，有讀過鏈上就用讀到的）
+    return _to_ui(int(raw_amount), _mint_decimals.get(USDC_MINT, 6))
+
+
+def _fetch_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str) -> float:
+    return parse_withdrawable(get_voltr_user_balance(vault_pubkey, user_pubkey))
+
+
+# stale-while-revalidate：30 秒內視為新鮮；過期的值仍先回傳，同時在背景更新
+WITHDRAWABLE_FRESH_SECONDS = 30
+_withdrawable_cache: Dict[Tuple[str, str], Tuple[float, float]] = {}  # (vault, user) -> (fetched_at, value)
+_withdrawable_refreshing: Set[Tuple[str, str]] = set()
+_withdrawable_lock = threading.Lock()
+
+
+def _store_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str, value: float) -> None:
+    with _withdrawable_lock:
+        _withdrawable_cache[(vault_pubkey, user_pubkey)] = (time.monotonic(), value)
+
+
+def _refresh_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str) -> None:
+    key = (vault_pubkey, user_pubkey)
+    try:
+        value = _fetch_voltr_user_withdrawable_usdc(vault_pubkey, user_pubkey)
+        _store_voltr_user_withdrawable_usdc(vault_pubkey, user_pubkey, value)
+    except Exception:
+        pass  # 背景更新失敗就保留舊值，下次呼叫會再試
+    finally:
+        with _withdrawable_lock:
+            _withdrawable_refreshing.discard(key)
 
-def get_voltr_share_price(vault_pubkey: str) -> Optional[float]:
-    """
-    可選：如果你想拿官方計算的 share price（asset per LP），
-    可以打 /vault/{pubkey}/share-price
-    """
-    url = f"{VOLTR_API_BASE}/vault/{vault_pubkey}/share-price"
-    r = requests.get(url)
-    r.raise_for_status()
-    data = r.json()
-    # 這裡不知道欄位名，先直接印出來給你看
-    return data  # 你可以改成 return data["sharePrice"] 之類的
 
 def get_voltr_user_withdrawable_usdc(vault_pubkey: str, user_pubkey: str) -> float:
     """
     用 Voltr API 取得真實可提領 USDC 數量（含外部倉位 NAV）
+
+    第一次呼叫會直接等 API；之後若快取已過期，先回傳上一次的值，
+    並開一個背景 thread 更新（同一組 vault/user 同時只會有一個更新在跑）。
+    """
+    key = (vault_pubkey, user_pubkey)
+    with _withdrawable_lock:
+        entry = _withdrawable_cache.get(key)
+
+    if entry is None:
+        value = _fetch_voltr_user_withdrawable_usdc(vault_pubkey, user_pubkey)
+        _store_voltr_user_withdrawable_usdc(vault_pubkey, user_pubkey, value)
+        return value
+
+    fetched_at, value = entry
+    if time.monotonic() - fetched_at >= WITHDRAWABLE_FRESH_SECONDS:
+        with _withdrawable_lock:
+            start_refresh = key not in _withdrawable_refreshing
+            _withdrawable_refreshing.add(key)
+        if start_refresh:
+            threading.Thread(
+                target=_refresh_voltr_user_withdrawable_usdc,
+                args=(vault_pubkey, user_pubkey),
+                daemon=True,
+            ).start()
+    return value
+
+
+# === Voltr API vs 鏈上估算：同時跑，Voltr 在時間預算內回來就用它 ===
+VOLTR_BUDGET_SECONDS = 0.5
+
+# 只給 race 用；Voltr 超時的那個 thread 會繼續跑完（結果進 withdrawable 快取），不擋呼叫端
+_race_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vectis-race")
+
+
+def get_user_withdrawable_fastest(
+    vault_pubkey: str,
+    user_pubkey: str,
+    user_lp_ata: str,
+    budget: float = VOLTR_BUDGET_SECONDS,
+) -> Dict[str, Any]:
     """
-    url = f"https://api.voltr.xyz/vault/{vault_pubkey}/user/{user_pubkey}/balance"
-    r = requests.get(url)
-    r.raise_for_status()
-    data = r.json()
+    Voltr API（權威值，但可能被 429 / 變慢）和鏈上 idle-only 估算同時送出。
+    Voltr 在 budget 秒內成功就回傳它；否則回傳已經平行算好的鏈上估算。
+    兩邊都失敗才丟 exception（丟 Voltr 的那個）。
+    """
+    voltr = _race_pool.submit(get_voltr_user_withdrawable_usdc, vault_pubkey, user_pubkey)
+    onchain = _race_pool.submit(get_user_withdrawable_onchain, user_lp_ata)
 
-    # 確保成功
-    if not data.get("success"):
-        raise RuntimeError(f"Voltr API returned error: {data}")
+    deadline = time.monotonic() + budget
+    pending = {voltr, onchain}
+    # 鏈上先回來也繼續等 Voltr，直到 budget 用完
+    while not voltr.done():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
 
-    raw_amount = data["data"]["userAssetAmount"]
+    if voltr.done() and voltr.exception() is None:
+        return {"source": "voltr", "withdrawable": voltr.result()}
 
-    # 依照 USDC decimals 轉成浮點
-    return raw_amount / 1_000_000
+    try:
+        return {"source": "onchain", "withdrawable": onchain.result()["withdrawable"]}
+    except Exception:
+        # 鏈上也失敗：只剩 Voltr 可以等
+        return {"source": "voltr", "withdrawable": voltr.result()}
 
 
 # === Debug：列出 authority 底下所有 token accounts ===
-def list_vault_token_accounts_by_authority() -> None:
+def format_vault_token_accounts_by_authority(balances: Optional[List[Tuple[str, str, int]]] = None) -> str:
+    # 組成文字再一次印出，平行跑的時候輸出才不會跟別的 probe 交錯
     authority = get_vault_token_authority()
-    accounts = get_token_accounts_by_owner(authority)
+    if balances is None:
+        balances = get_token_balances_by_owner(authority)
+
+    lines = [f"\n=== Vault Token Accounts (token owner = {authority}) ==="]
+    if not balances:
+        lines.append("No SPL token accounts found for this authority.")
+        return "\n".join(lines)
+
+    for i, (pubkey, mint, amount) in enumerate(balances):
+        # decimals 不在 slice 裡：這個 vault 自己的 USDC / LP mint 一定換算（有快取、會存檔），
+        # 其他 mint 讀過才換算，沒讀過直接印 raw，不為了 debug 多打 RPC
+        decimals = get_mint_decimals(mint) if mint in (USDC_MINT, VAULT_LP_MINT) else _mint_decimals.get(mint)
+        lines.append(f"[{i}] {pubkey}")
+        lines.append(f"     mint:   {mint}")
+        if decimals is None:
+            lines.append(f"     amount: {amount} (raw, decimals unknown)")
+        else:
+            lines.append(f"     amount: {_to_ui(amount, decimals)} (decimals={decimals})")
+    return "\n".join(lines)
 
-    print(f"\n=== Vault Token Accounts (token owner = {authority}) ===")
-    if not accounts:
-        print("No SPL token accounts found for this authority.")
-        return
 
-    for i, acc in enumerate(accounts):
-        pubkey = acc.get("pubkey")
-        data = acc.get("account", {}).get("data", {})
-        parsed = data.get("parsed", {})
-        info = parsed.get("info", {})
-        mint = info.get("mint")
-        token_amount = info.get("tokenAmount", {})
-        ui_amount = token_amount.get("uiAmount")
-        decimals = token_amount.get("decimals")
+def list_vault_token_accounts_by_authority() -> None:
+    print(format_vault_token_accounts_by_authority())
 
-        print(f"[{i}] {pubkey}")
-        print(f"     mint:   {mint}")
-        print(f"     amount: {ui_amount} (decimals={decimals})")
+
+# === CLI probes：每個回傳要印的文字 ===
+def probe_onchain(user_lp_ata: str) -> str:
+    # 1) 純鏈上（只看 idle）的版本
+    onchain = get_user_withdrawable_onchain(user_lp_ata)
+    return "\n".join(
+        [
+            "\n--- On-chain (idle only) ---",
+            f"Vault NAV (USDC, idle only): {onchain['vault_nav']:.6f}",
+            f"LP Total Supply:             {onchain['lp_supply']:.6f}",
+            f"Your LP Amount:              {onchain['user_lp']:.6f}",
+            f"LP Price (USDC/LP):          {onchain['lp_price']:.6f}",
+            f"Your Share of Vault:         {onchain['share'] * 100:.6f} %",
+            f"Your Withdrawable (idle):    {onchain['withdrawable']:.6f}",
+            f"Idle USDC in Vault:          {onchain['idle_usdc']:.6f}",
+            f"Idle Ratio:                  {onchain['idle_ratio'] * 100:.6f} %",
+        ]
+    )
+
+
+def probe_voltr_api() -> str:
+    # 2) Voltr 官方 API：真正的 vault balance（含外部倉位）
+    # raw 和解析後的數字都從同一份回應來；順便更新 withdrawable 快取
+    api_balance = get_voltr_user_balance(VAULT_STATE_PDA, USER_WALLET)
+    withdrawable = parse_withdrawable(api_balance)
+    _store_voltr_user_withdrawable_usdc(VAULT_STATE_PDA, USER_WALLET, withdrawable)
+    return "\n".join(
+        [
+            "\n--- Voltr API: /vault/{vault}/user/{user}/balance ---",
+            "Raw JSON response:",
+            str(api_balance),
+            f"Withdrawable (USDC): {withdrawable:.6f}",
+        ]
+    )
+
+
+def probe_token_accounts() -> str:
+    # 3) Debug: authority token accounts
+    header = "\n--- Debug: Vault Token Accounts (by token authority) ---"
+    return header + "\n" + format_vault_token_accounts_by_authority()
+
+
+def probe_withdrawable_fastest(user_lp_ata: str) -> str:
+    # 4) Voltr vs 鏈上：誰在預算內回來就用誰
+    best = get_user_withdrawable_fastest(VAULT_STATE_PDA, USER_WALLET, user_lp_ata)
+    return "\n".join(
+        [
+            f"\n--- Withdrawable (Voltr within {VOLTR_BUDGET_SECONDS * 1000:.0f} ms, else on-chain) ---",
+            f"Source:       {best['source']}",
+            f"Withdrawable: {best['withdrawable']:.6f}",
+        ]
+    )
 
 
 # === CLI Entry ===
@@ -214,34 +704,18 @@ if __name__ == "__main__":
 
     print("\n=== VECTIS / VOLTR VAULT MONITOR ===")
 
-    # 1) 純鏈上（只看 idle）的版本
-    try:
-        onchain = get_user_withdrawable_onchain(USER_LP_ATA)
-
-        print("\n--- On-chain (idle only) ---")
-        print(f"Vault NAV (USDC, idle only): {onchain['vault_nav']:.6f}")
-        print(f"LP Total Supply:             {onchain['lp_supply']:.6f}")
-        print(f"Your LP Amount:              {onchain['user_lp']:.6f}")
-        print(f"LP Price (USDC/LP):          {onchain['lp_price']:.6f}")
-        print(f"Your Share of Vault:         {onchain['share'] * 100:.6f} %")
-        print(f"Your Withdrawable (idle):    {onchain['withdrawable']:.6f}")
-        print(f"Idle USDC in Vault:          {onchain['idle_usdc']:.6f}")
-        print(f"Idle Ratio:                  {onchain['idle_ratio'] * 100:.6f} %")
-    except Exception as e:
-        print("Error while fetching on-chain data:", e)
-
-    # 2) Voltr 官方 API：真正的 vault balance（含外部倉位）
-    try:
-        api_balance = get_voltr_user_balance(VAULT_STATE_PDA, USER_WALLET)
-        print("\n--- Voltr API: /vault/{vault}/user/{user}/balance ---")
-        print("Raw JSON response:")
-        print(api_balance)
-    except Exception as e:
-        print("Error while calling Voltr API:", e)
-
-    # 3) Debug: authority token accounts
-    try:
-        print("\n--- Debug: Vault Token Accounts (by token authority) ---")
-        list_vault_token_accounts_by_authority()
-    except Exception as e:
-        print("Error while listing vault token accounts:", e)
+    # 這幾個 probe 互相獨立、都在等網路，一起送出；總時間 ≈ 最慢的那個，而不是全部相加。
+    # 誰先回來就先印誰。
+    probes = [
+        ("fetching on-chain data", lambda: probe_onchain(USER_LP_ATA)),
+        ("calling Voltr API", probe_voltr_api),
+        ("listing vault token accounts", probe_token_accounts),
+        ("racing Voltr API against on-chain", lambda: probe_withdrawable_fastest(USER_LP_ATA)),
+    ]
+    with ThreadPoolExecutor(max_workers=len(probes)) as ex:
+        futures = {ex.submit(fn): label for label, fn in probes}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as e:
+                print(f"Error while {futures[future]}:", e)